@@ -18,7 +18,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import all models so SQLModel.metadata picks them up
-from models import User, Account, Transaction, CashflowItem, MovementLog, Subscription  # noqa: F401
+from models import User, Account, Transaction, CashflowItem, MovementLog, Subscription, PlaidItem  # noqa: F401
 from sqlmodel import SQLModel
 
 # ── Alembic Config ──────────────────────────────────────────
@@ -0,0 +1,24 @@
+"""add composite index transactions(user_id, date)
+
+Revision ID: 3f1c9a7d2e40
+Revises: bd322c6ada8b
+Create Date: 2026-10-16 09:12:04.118230+00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2e40'
+down_revision: Union[str, None] = 'bd322c6ada8b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_transactions_user_date', 'transactions', ['user_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_user_date', table_name='transactions')
@@ -0,0 +1,29 @@
+"""add composite indexes accounts(user_id, type), movement_log(user_id, status, date_executed)
+
+Revision ID: 8b2e4f6a1c93
+Revises: 3f1c9a7d2e40
+Create Date: 2026-10-16 11:47:22.503918+00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4f6a1c93'
+down_revision: Union[str, None] = '3f1c9a7d2e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_accounts_user_type', 'accounts', ['user_id', 'type'], unique=False)
+    op.create_index(
+        'ix_movement_log_user_status_date', 'movement_log',
+        ['user_id', 'status', 'date_executed'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_movement_log_user_status_date', table_name='movement_log')
+    op.drop_index('ix_accounts_user_type', table_name='accounts')
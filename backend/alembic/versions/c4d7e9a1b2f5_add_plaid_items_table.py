@@ -0,0 +1,34 @@
+"""add plaid_items table (per-user Plaid access tokens, encrypted at rest)
+
+Revision ID: c4d7e9a1b2f5
+Revises: 8b2e4f6a1c93
+Create Date: 2026-10-16 14:05:31.218406+00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d7e9a1b2f5'
+down_revision: Union[str, None] = '8b2e4f6a1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('plaid_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.UUID(as_uuid=False), nullable=False),
+    sa.Column('access_token_encrypted', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('item_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_plaid_items_user_id'), 'plaid_items', ['user_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_plaid_items_user_id'), table_name='plaid_items')
+    op.drop_table('plaid_items')
@@ -0,0 +1,80 @@
+"""
+KoreX Financial System — In-Process TTL Cache
+
+Small thread-safe cache for hot read paths (dashboard projections, etc.).
+Entries expire after `ttl_seconds`; the oldest entry is evicted once
+`maxsize` is reached. Lives per worker process — no external service needed.
+
+Usage:
+    from cache import TTLCache, stable_digest
+
+    _projection_cache = TTLCache(ttl_seconds=3600, maxsize=2048)
+    key = (user_id, stable_digest(shield_target, debts))
+    cached = _projection_cache.get(key)
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded mapping whose entries expire `ttl_seconds` after insertion."""
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def discard(self, key: Hashable) -> None:
+        """Drop `key` if present (point invalidation, no scan)."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate(self, match: Optional[Callable[[Hashable], bool]] = None) -> None:
+        """Drop every entry (or only the keys for which `match(key)` is true)."""
+        with self._lock:
+            if match is None:
+                self._data.clear()
+                return
+            for key in [k for k in self._data if match(k)]:
+                del self._data[key]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def stable_digest(*parts: Any) -> str:
+    """Short blake2b digest of the repr of `parts` — used as a content cache key."""
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
@@ -1,5 +1,6 @@
 from sqlmodel import create_engine, SQLModel, Session, select
 from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from models import User, Account, Transaction, CashflowItem, MovementLog, Subscription
 from decimal import Decimal
 
@@ -23,7 +24,22 @@ def _make_sqlite_engine():
 
 if DATABASE_URL:
     try:
-        engine = create_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
+        pg_kwargs = {}
+        if make_url(DATABASE_URL).get_driver_name() == "psycopg2":
+            # Batch executemany() (seed inserts, bulk updates) into a few round trips
+            pg_kwargs["executemany_mode"] = "values_plus_batch"
+        engine = create_engine(
+            DATABASE_URL,
+            echo=False,
+            # Pool sized for FastAPI's threadpool (sync handlers) + bursty dashboard polls.
+            # LIFO keeps a small hot set of connections; recycle before pooler idle timeouts.
+            pool_size=int(os.environ.get("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.environ.get("DB_MAX_OVERFLOW", "20")),
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            pool_use_lifo=True,
+            **pg_kwargs,
+        )
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
         print("[OK] Connected to PostgreSQL")
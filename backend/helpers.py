@@ -2,12 +2,19 @@
 Shared helpers used across multiple routers.
 - FK bypass context manager (needed for demo/test seeding with Supabase FK constraints)
 - Common Account → DebtAccount conversion
+- Velocity budget (20% of liquid cash) in integer cents
+- TTL-cached Peace Shield target lookup
+- Memoized debt alert scan and velocity projections
 """
 from contextlib import contextmanager
+from datetime import date
 from decimal import Decimal
 
 from sqlalchemy import text
-from velocity_engine import DebtAccount
+from sqlmodel import select
+from cache import TTLCache, stable_digest
+from models import User
+from velocity_engine import DebtAccount, DEFAULT_PEACE_SHIELD, detect_debt_alerts, get_projections
 
 
 DEMO_USER_ID = "00000000-0000-4000-a000-000000000001"
@@ -91,3 +98,60 @@ def accounts_to_active_debt_objects(accounts, plan_limit: int | None = None) ->
 def get_liquid_cash(accounts) -> Decimal:
     """Sum of non-debt account balances."""
     return sum(acc.balance for acc in accounts if acc.type != "debt")
+
+
+def velocity_power(liquid_cash) -> Decimal:
+    """Monthly velocity budget: 20% of liquid cash, rounded to the cent.
+
+    Done in integer cents. A fifth of a whole number of cents is never a
+    half-cent tie, so the result equals quantize(Decimal('0.01')) under any
+    rounding mode — without the Decimal multiply/quantize per request.
+    """
+    fifths, remainder = divmod(round(liquid_cash * 100), 5)
+    return Decimal(fifths + (remainder >= 3)).scaleb(-2)
+
+
+# The users table holds a single global settings row (no tenant column),
+# so one cached value serves every request until it expires or is updated.
+_shield_cache = TTLCache(ttl_seconds=60, maxsize=1)
+
+
+def get_shield_target(session) -> Decimal:
+    """Peace Shield target from the settings row, cached in-process for 60s."""
+    cached = _shield_cache.get("shield_target")
+    if cached is not None:
+        return cached
+    user = session.exec(select(User).limit(1)).first()
+    shield_target = user.shield_target if user else DEFAULT_PEACE_SHIELD
+    _shield_cache.set("shield_target", shield_target)
+    return shield_target
+
+
+def invalidate_shield_target() -> None:
+    """Drop the cached shield target (call after writing to the users table)."""
+    _shield_cache.invalidate()
+
+
+# detect_debt_alerts is pure in (name, balance, APR, min payment); dashboard polls
+# repeat the same snapshot, so memoize on that signature.
+_debt_alerts_cache = TTLCache(ttl_seconds=3600, maxsize=4096)
+
+
+def cached_debt_alerts(debts: list[DebtAccount]) -> list[dict]:
+    """detect_debt_alerts(), memoized on the debts' immutable signature."""
+    if not debts:
+        return []
+    key = stable_digest([(d.name, d.balance, d.interest_rate, d.min_payment) for d in debts])
+    return _debt_alerts_cache.get_or_compute(key, lambda: detect_debt_alerts(debts))
+
+
+# get_projections runs the full month-by-month payoff simulation twice (standard vs
+# velocity). The key covers every input (and today's date, which anchors the payoff
+# dates), so a balance change after an executed movement simply misses the cache.
+_projections_cache = TTLCache(ttl_seconds=60, maxsize=4096)
+
+
+def cached_projections(debts: list[DebtAccount], liquid_cash: Decimal) -> dict:
+    """get_projections(), memoized for 60s on the debts, liquid cash and date."""
+    key = stable_digest(date.today(), liquid_cash, debts)
+    return _projections_cache.get_or_compute(key, lambda: get_projections(debts, liquid_cash))
@@ -2,6 +2,7 @@ from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
 from sqlmodel import Field, SQLModel, Relationship, Column
+from sqlalchemy import Index
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 import uuid
 
@@ -42,6 +43,10 @@ class Account(SQLModel, table=True):
     
     transactions: List["Transaction"] = Relationship(back_populates="account")
 
+    __table_args__ = (
+        Index("ix_accounts_user_type", "user_id", "type"),  # per-user debt / liquid splits
+    )
+
 class CashflowItem(SQLModel, table=True):
     __tablename__ = "cashflow_items"
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -78,6 +83,10 @@ class Transaction(SQLModel, table=True):
     
     account: Optional[Account] = Relationship(back_populates="transactions")
 
+    __table_args__ = (
+        Index("ix_transactions_user_date", "user_id", "date"),  # cashflow monitor window scans
+    )
+
 class MovementLog(SQLModel, table=True):
     __tablename__ = "movement_log"
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -90,6 +99,10 @@ class MovementLog(SQLModel, table=True):
     status: str = Field(default="executed") # executed, verified
     verified_transaction_id: Optional[int] = Field(default=None, foreign_key="transactions.id")
 
+    __table_args__ = (
+        Index("ix_movement_log_user_status_date", "user_id", "status", "date_executed"),  # attack streak scans
+    )
+
 class Subscription(SQLModel, table=True):
     __tablename__ = "subscriptions"
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -104,6 +117,13 @@ class Subscription(SQLModel, table=True):
     created_at: Optional[str] = Field(default=None)
     updated_at: Optional[str] = Field(default=None)
 
+class PlaidItem(SQLModel, table=True):
+    __tablename__ = "plaid_items"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: Optional[str] = Field(default=None, sa_column=Column(PG_UUID(as_uuid=False), index=True, nullable=False, unique=True))
+    access_token_encrypted: str  # Fernet-encrypted Plaid access token (token_crypto); one linked bank per user
+    item_id: str
+
 class UserSettings(SQLModel, table=True):
     __tablename__ = "user_settings"
     id: Optional[int] = Field(default=None, primary_key=True)
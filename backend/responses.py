@@ -0,0 +1,41 @@
+"""
+KoreX Financial System — Fast JSON Responses
+
+orjson-backed response class for payload-heavy endpoints (dashboard,
+command center). Return it directly from a handler to skip FastAPI's
+jsonable_encoder pass: orjson serializes dicts, lists, dataclasses and
+dates natively, and Decimals are encoded exactly like FastAPI does
+(int when integral, float otherwise) so the wire format is unchanged.
+
+Usage in routers:
+    from responses import KoreXJSONResponse
+
+    return KoreXJSONResponse({"total_debt": Decimal("1250.00"), ...})
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize `content` with orjson, handling Decimal like FastAPI's encoder."""
+    return orjson.dumps(
+        content,
+        default=_orjson_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+class KoreXJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (Decimal-aware)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -11,9 +11,6 @@ from models import Account, Transaction, MovementLog, CashflowItem, UserSettings
 from schemas import BalanceUpdate
 from helpers import bypass_fk
 from auth import get_current_user_id
-
-import sys, os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 from core_engine.calculators import calculate_minimum_payment
 
 router = APIRouter(prefix="/api", tags=["accounts"])
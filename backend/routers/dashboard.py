@@ -1,42 +1,102 @@
 """
 Dashboard Router — Main dashboard metrics and cashflow monitor.
 """
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, Depends, Query
 from sqlmodel import Session, select
+from sqlalchemy import func
 from decimal import Decimal
 from datetime import date, timedelta
+from calendar import monthrange
+from itertools import accumulate
+from typing import Literal
 
 from database import engine
-from models import Account, CashflowItem, Transaction, User
-from helpers import accounts_to_debt_objects, filter_active_debt_accounts, accounts_to_active_debt_objects
-from auth import get_current_user_id
-from velocity_engine import (
-    DebtAccount, get_velocity_target, DEFAULT_PEACE_SHIELD,
-    calculate_safe_attack_equity, detect_debt_alerts,
+from models import Account, CashflowItem, Transaction
+from helpers import (
+    filter_active_debt_accounts, accounts_to_active_debt_objects,
+    get_shield_target, cached_debt_alerts,
 )
-
-import sys, os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from core_engine.calculators import calculate_minimum_payment
+from auth import get_current_user_id
+from cache import TTLCache, stable_digest
+from responses import KoreXJSONResponse
+from velocity_engine import calculate_safe_attack_equity
 
 router = APIRouter(prefix="/api", tags=["dashboard"])
 
+# Cashflow monitor look-back window per timeframe (unknown values are rejected with 422)
+MONITOR_WINDOW_DAYS = {"daily": 0, "weekly": 7, "monthly": 30, "annual": 365}
+
+# Bound format methods — reused for every money string in the advice copy
+_fmt_money = "${:,.2f}".format
+_fmt_money_whole = "${:,.0f}".format
+
+# Safety projections keyed by a digest of every input (incl. today's date),
+# so edits to accounts/cashflow naturally produce a new key — no invalidation needed.
+_safety_cache = TTLCache(ttl_seconds=3600, maxsize=2048)
+
+
+def _cached_safe_attack_equity(user_id, liquid_cash, shield_target, debt_objects, incomes, expenses):
+    key = (user_id, stable_digest(
+        date.today(),
+        liquid_cash,
+        shield_target,
+        [(d.name, d.balance, d.interest_rate, d.min_payment, d.due_day) for d in debt_objects],
+        [(i["name"], i["amount"], i["day"]) for i in incomes],
+        [(e["name"], e["amount"], e["day"]) for e in expenses],
+    ))
+    return _safety_cache.get_or_compute(key, lambda: calculate_safe_attack_equity(
+        liquid_cash, shield_target, debt_objects,
+        recurring_incomes=incomes if incomes else None,
+        recurring_expenses=expenses if expenses else None,
+    ))
+
+
+def _monthly_recurring(cashflow_items, category: str) -> list[dict]:
+    """Monthly cashflow items of one category in the shape the projection engine expects."""
+    return [
+        {
+            "name": item.name,
+            "amount": Decimal(str(item.amount)),
+            "day": item.day_of_month or 1,
+        }
+        for item in cashflow_items
+        if item.category == category and item.frequency == "monthly"
+    ]
+
+
+def _next_occurrence(day: int, today: date) -> date:
+    """Next date (today or later) falling on `day` of the month, clamped to month length."""
+    if day >= today.day:
+        y, m = today.year, today.month
+    else:
+        y, m = today.year + today.month // 12, today.month % 12 + 1
+    return date(y, m, min(day, monthrange(y, m)[1]))
 
-@router.get("/dashboard")
+
+def _greedy_take(available: list[float], cap: float) -> list[float]:
+    """Fill `cap` from `available` in priority order (running-sum formulation).
+
+    Each source gives min(its balance, whatever is still uncovered after the
+    sources before it), rounded to cents.
+    """
+    covered_before = accumulate(available, initial=0.0)
+    return [round(min(a, max(0.0, cap - prior)), 2) for a, prior in zip(available, covered_before)]
+
+
+@router.get("/dashboard", response_class=KoreXJSONResponse)
 async def get_dashboard_metrics(
     user_id: str = Depends(get_current_user_id),
     plan_limit: int | None = Query(None, description="Max active debt accounts per subscription plan"),
+    include: list[str] = Query([], description="Optional heavy sections to embed, e.g. 'calendar'"),
 ):
     with Session(engine) as session:
         accounts = session.exec(select(Account).where(Account.user_id == user_id)).all()
-        user = session.exec(select(User)).first()
-        shield_target = user.shield_target if user else DEFAULT_PEACE_SHIELD
+        shield_target = get_shield_target(session)
 
         # Plan-aware filtering: only active (unlocked) debts count
         # Note: only debts with balance > 0 are relevant (matches filter_active_debt_accounts)
         all_debts = [acc for acc in accounts if acc.type == "debt" and acc.balance > 0]
         active_debts = filter_active_debt_accounts(accounts, plan_limit)
-        active_debt_ids = {id(a) for a in active_debts}
 
         total_debt = sum(acc.balance for acc in active_debts)
         total_all_debt = sum(acc.balance for acc in all_debts)
@@ -58,33 +118,13 @@ async def get_dashboard_metrics(
             select(CashflowItem).where(CashflowItem.user_id == user_id)
         ).all()
 
-        # Build recurring incomes list from actual DB data
-        real_incomes = [
-            {
-                "name": item.name,
-                "amount": Decimal(str(item.amount)),
-                "day": item.day_of_month or 1,
-            }
-            for item in cashflow_items
-            if item.category == "income" and item.frequency == "monthly"
-        ]
-
-        # Build recurring expenses list (non-debt bills: rent, utilities, etc.)
-        real_expenses = [
-            {
-                "name": item.name,
-                "amount": Decimal(str(item.amount)),
-                "day": item.day_of_month or 1,
-            }
-            for item in cashflow_items
-            if item.category == "expense" and item.frequency == "monthly"
-        ]
+        # Build recurring income / expense (non-debt bills: rent, utilities, etc.) lists from actual DB data
+        real_incomes = _monthly_recurring(cashflow_items, "income")
+        real_expenses = _monthly_recurring(cashflow_items, "expense")
 
-        # Calculate Safe Attack Equity with REAL data
-        safety_data = calculate_safe_attack_equity(
-            liquid_cash, shield_target, debt_objects,
-            recurring_incomes=real_incomes if real_incomes else None,
-            recurring_expenses=real_expenses if real_expenses else None,
+        # Calculate Safe Attack Equity with REAL data (cached per input snapshot)
+        safety_data = _cached_safe_attack_equity(
+            user_id, liquid_cash, shield_target, debt_objects, real_incomes, real_expenses,
         )
 
         attack_equity = safety_data["safe_equity"]
@@ -95,31 +135,21 @@ async def get_dashboard_metrics(
         velocity_target = None
 
         if debts:
-            target_account = max(debts, key=lambda x: x.interest_rate)
+            # filter_active_debt_accounts already sorted by APR desc (stable → same pick as max())
+            target_account = debts[0]
 
             # --- SMART ADVICE LOGIC ---
             today = date.today()
 
-            # 1. Find Next Payday (from Cashflow Items)
-            incomes = [cf for cf in cashflow_items if cf.amount > 0]
-            next_payday = today + timedelta(days=30)  # Default backup
-
-            if incomes:
-                candidates = []
-                for inc in incomes:
-                    try:
-                        d = int(inc.day_of_month)
-                        candidate_date = date(today.year, today.month, d)
-                        if candidate_date < today:
-                            if today.month == 12:
-                                candidate_date = date(today.year + 1, 1, d)
-                            else:
-                                candidate_date = date(today.year, today.month + 1, d)
-                        candidates.append(candidate_date)
-                    except Exception:
-                        pass
-                if candidates:
-                    next_payday = min(candidates)
+            # 1. Find Next Payday (from monthly income Cashflow Items)
+            pay_days = [
+                int(cf.day_of_month) for cf in cashflow_items
+                if cf.category == "income" and cf.frequency == "monthly" and cf.day_of_month
+            ]
+            next_payday = min(
+                (_next_occurrence(d, today) for d in pay_days),
+                default=today + timedelta(days=30),  # Default backup
+            )
 
             # 2. Determine Action Date
             has_surplus = attack_equity > 0
@@ -130,21 +160,18 @@ async def get_dashboard_metrics(
             r = target_account.interest_rate
             daily_interest = b * (r / Decimal("100")) / Decimal("365")
 
-            monthly_interest_cost = b * (r / Decimal("100")) / Decimal("12")
-            principal_part = max(Decimal("0"), target_account.min_payment - monthly_interest_cost)
-
             # 4. Justification
             if has_surplus:
                 why_text = (
-                    f"Tienes un excedente SEGURO de ${float(attack_equity):,.2f}. "
-                    f"(Ya reservamos ${float(reserved_for_bills):,.2f} para facturas próximas). "
+                    f"Tienes un excedente SEGURO de {_fmt_money(attack_equity)}. "
+                    f"(Ya reservamos {_fmt_money(reserved_for_bills)} para facturas próximas). "
                     f"Ataca hoy para eliminar interés diario."
                 )
             else:
                 if reserved_for_bills > 0:
                     why_text = (
                         f"Tu ataque está pausado por Seguridad. "
-                        f"Reservando ${float(reserved_for_bills):,.2f} para pagos mínimos próximos. "
+                        f"Reservando {_fmt_money(reserved_for_bills)} para pagos mínimos próximos. "
                         f"La prioridad es sobrevivir este mes."
                     )
                 else:
@@ -159,73 +186,68 @@ async def get_dashboard_metrics(
             checking_name = chase_acc.name if chase_acc else "Checking"
 
             if attack_amount > 0:
-                # Gather ALL liquid accounts with positive balance
+                # Gather ALL liquid accounts with positive balance (float balance computed once)
                 liquid_accounts = [
-                    acc for acc in accounts
-                    if acc.type != "debt" and float(acc.balance) > 0
+                    (acc, float(acc.balance)) for acc in accounts
+                    if acc.type != "debt" and acc.balance > 0
                 ]
                 # Priority: checking first, then savings, then by balance desc
-                liquid_accounts.sort(
-                    key=lambda a: (0 if a.type == "checking" else 1, -float(a.balance))
-                )
+                liquid_accounts.sort(key=lambda p: (0 if p[0].type == "checking" else 1, -p[1]))
 
-                allocation_plan = []
-                remaining = min(attack_amount, target_balance)
-                total_allocated = 0
-
-                for acc in liquid_accounts:
-                    if remaining <= 0:
-                        break
-                    available = float(acc.balance)
-                    take = round(min(available, remaining), 2)
-                    if take > 0:
-                        allocation_plan.append({
-                            "source_name": acc.name,
-                            "source_type": acc.type,
-                            "amount": take,
-                            "balance_after": round(available - take, 2),
-                        })
-                        remaining -= take
-                        total_allocated += take
+                cash_takes = _greedy_take(
+                    [available for _, available in liquid_accounts],
+                    min(attack_amount, target_balance),
+                )
+                allocation_plan = [
+                    {
+                        "source_name": acc.name,
+                        "source_type": acc.type,
+                        "amount": take,
+                        "balance_after": round(available - take, 2),
+                    }
+                    for (acc, available), take in zip(liquid_accounts, cash_takes)
+                    if take > 0
+                ]
+                total_allocated = sum(a["amount"] for a in allocation_plan)
 
                 # Check if we still need velocity weapons to cover the gap
                 weapon_shortfall = target_balance - total_allocated
                 weapon_allocations = []
 
                 if weapon_shortfall > 0:
-                    weapon_candidates = []
-                    for acc in accounts:
-                        if (acc.type == "debt"
-                            and acc.debt_subtype in ("uil", "heloc")
-                            and (acc.credit_limit or 0) > acc.balance
-                            and float(acc.interest_rate) < target_apr):
-                            avail_credit = float((acc.credit_limit or 0) - acc.balance)
-                            spread = target_apr - float(acc.interest_rate)
-                            weapon_candidates.append({
-                                "type": acc.debt_subtype,
-                                "source_name": acc.name,
-                                "available": avail_credit,
-                                "apr": float(acc.interest_rate),
-                                "spread": spread,
-                            })
+                    weapon_candidates = [
+                        {
+                            "type": acc.debt_subtype,
+                            "source_name": acc.name,
+                            "available": float((acc.credit_limit or 0) - acc.balance),
+                            "apr": float(acc.interest_rate),
+                            "spread": target_apr - float(acc.interest_rate),
+                        }
+                        for acc in accounts
+                        if acc.type == "debt"
+                        and acc.debt_subtype in ("uil", "heloc")
+                        and (acc.credit_limit or 0) > acc.balance
+                        and float(acc.interest_rate) < target_apr
+                    ]
                     weapon_candidates.sort(
                         key=lambda w: (0 if w["type"] == "uil" else 1, -w["spread"])
                     )
 
-                    for w in weapon_candidates:
-                        if weapon_shortfall <= 0:
-                            break
-                        take_w = round(min(w["available"], weapon_shortfall), 2)
-                        if take_w > 0:
-                            weapon_allocations.append({
-                                "source_name": w["source_name"],
-                                "source_type": w["type"],
-                                "amount": take_w,
-                                "apr": w["apr"],
-                                "spread": w["spread"],
-                            })
-                            weapon_shortfall -= take_w
-                            total_allocated += take_w
+                    weapon_takes = _greedy_take(
+                        [w["available"] for w in weapon_candidates], weapon_shortfall,
+                    )
+                    weapon_allocations = [
+                        {
+                            "source_name": w["source_name"],
+                            "source_type": w["type"],
+                            "amount": take_w,
+                            "apr": w["apr"],
+                            "spread": w["spread"],
+                        }
+                        for w, take_w in zip(weapon_candidates, weapon_takes)
+                        if take_w > 0
+                    ]
+                    total_allocated += sum(w["amount"] for w in weapon_allocations)
 
                 # Build the recommended_source with full breakdown
                 all_sources = [a["source_name"] for a in allocation_plan]
@@ -245,14 +267,12 @@ async def get_dashboard_metrics(
                     rec_type = "multi"
 
                 # Build reason
-                parts = []
-                for a in allocation_plan:
-                    parts.append(f"${a['amount']:,.2f} de {a['source_name']}")
-                for w in weapon_allocations:
-                    parts.append(
-                        f"${w['amount']:,.2f} de {w['source_name']} "
-                        f"({w['apr']}% APR, spread +{w['spread']:.1f}%)"
-                    )
+                parts = [f"{_fmt_money(a['amount'])} de {a['source_name']}" for a in allocation_plan]
+                parts += [
+                    f"{_fmt_money(w['amount'])} de {w['source_name']} "
+                    f"({w['apr']}% APR, spread +{w['spread']:.1f}%)"
+                    for w in weapon_allocations
+                ]
                 reason = " + ".join(parts) if parts else "Sin fuentes disponibles"
 
                 recommended_source = {
@@ -273,7 +293,7 @@ async def get_dashboard_metrics(
                 "action_date": action_date.strftime("%Y-%m-%d"),
                 "priority_reason": f"Atacamos {target_account.name} (APR {float(r)}%) tras asegurar tus facturas.",
                 "justification": why_text,
-                "shield_note": f"🛡️ Shield: ${float(shield_target):,.0f} | 📅 Bills: ${float(reserved_for_bills):,.0f}",
+                "shield_note": f"🛡️ Shield: {_fmt_money_whole(shield_target)} | 📅 Bills: {_fmt_money_whole(reserved_for_bills)}",
                 "daily_interest_saved": float(daily_interest),
                 "next_payday": next_payday.strftime("%Y-%m-%d"),
                 "recommended_source": recommended_source,
@@ -281,7 +301,7 @@ async def get_dashboard_metrics(
             }
 
         # --- DEBT ALERTS (Phase 4 integration) ---
-        debt_alerts = detect_debt_alerts(debt_objects) if debt_objects else []
+        debt_alerts = cached_debt_alerts(debt_objects)
 
         # --- TOTAL DAILY INTEREST (for DailyInterestTicker) ---
         total_daily_interest = sum(
@@ -306,7 +326,7 @@ async def get_dashboard_metrics(
             and (acc.credit_limit or 0) > acc.balance
         ]
 
-        return {
+        response = {
             "total_debt": total_debt,
             "liquid_cash": liquid_cash,
             "chase_balance": chase_balance,
@@ -314,7 +334,6 @@ async def get_dashboard_metrics(
             "attack_equity": attack_equity,
             "reserved_for_bills": float(reserved_for_bills),
             "safety_breakdown": safety_data["breakdown"],
-            "calendar": safety_data.get("projection_data", []),
             "velocity_target": velocity_target,
             "velocity_weapons": velocity_weapons,
             "unmonitored_debt": float(unmonitored_debt),
@@ -322,39 +341,61 @@ async def get_dashboard_metrics(
             "debt_alerts": debt_alerts,
             "total_daily_interest": round(total_daily_interest, 2),
         }
+        # Day-by-day projection is large and rarely rendered with the summary — opt-in only
+        if "calendar" in include:
+            response["calendar"] = safety_data.get("projection_data", [])
+        return KoreXJSONResponse(response)
+
+
+@router.get("/dashboard/calendar", response_class=KoreXJSONResponse)
+async def get_dashboard_calendar(
+    user_id: str = Depends(get_current_user_id),
+    plan_limit: int | None = Query(None, description="Max active debt accounts per subscription plan"),
+):
+    """Day-by-day safety projection, served separately from the dashboard summary."""
+    with Session(engine) as session:
+        accounts = session.exec(select(Account).where(Account.user_id == user_id)).all()
+        cashflow_items = session.exec(
+            select(CashflowItem).where(CashflowItem.user_id == user_id)
+        ).all()
+        liquid_cash = sum(acc.balance for acc in accounts if acc.type != "debt")
+        safety_data = _cached_safe_attack_equity(
+            user_id, liquid_cash, get_shield_target(session),
+            accounts_to_active_debt_objects(accounts, plan_limit),
+            _monthly_recurring(cashflow_items, "income"),
+            _monthly_recurring(cashflow_items, "expense"),
+        )
+        return KoreXJSONResponse({"calendar": safety_data.get("projection_data", [])})
 
 
 @router.get("/dashboard/cashflow_monitor")
-async def get_dashboard_monitor(timeframe: str = "monthly", type: str = "income", user_id: str = Depends(get_current_user_id)):
+async def get_dashboard_monitor(
+    timeframe: Literal["daily", "weekly", "monthly", "annual"] = "monthly",
+    type: str = "income",
+    user_id: str = Depends(get_current_user_id),
+):
     """
     Calculate total cashflow (Income or Expense) for a specific timeframe.
     Timeframes: 'daily' (Today), 'weekly' (7d), 'monthly' (30d), 'annual' (365d).
     Type: 'income' (Inflows), 'expense' (Outflows).
     """
     with Session(engine) as session:
-        today = date.today()
-        start_date = today
-
-        if timeframe == "weekly":
-            start_date = today - timedelta(days=7)
-        elif timeframe == "monthly":
-            start_date = today - timedelta(days=30)
-        elif timeframe == "annual":
-            start_date = today - timedelta(days=365)
-
-        query = select(Transaction).where(Transaction.date >= start_date, Transaction.user_id == user_id)
-        all_txs_in_window = session.exec(query).all()
+        start_date = date.today() - timedelta(days=MONITOR_WINDOW_DAYS[timeframe])
 
+        # Aggregate in SQL (uses ix_transactions_user_date) — only one row comes back
         if type == "income":
-            filtered_txs = [tx for tx in all_txs_in_window if tx.amount > 0]
-            total_amount = sum(tx.amount for tx in filtered_txs)
+            sign_filter, signed_amount = Transaction.amount > 0, Transaction.amount
         else:
-            filtered_txs = [tx for tx in all_txs_in_window if tx.amount < 0]
-            total_amount = sum(abs(tx.amount) for tx in filtered_txs)
+            sign_filter, signed_amount = Transaction.amount < 0, -Transaction.amount
+
+        total_amount, transaction_count = session.exec(
+            select(func.coalesce(func.sum(signed_amount), 0), func.count())
+            .where(Transaction.user_id == user_id, Transaction.date >= start_date, sign_filter)
+        ).one()
 
         return {
             "timeframe": timeframe,
             "type": type,
             "total_amount": total_amount,
-            "transaction_count": len(filtered_txs),
+            "transaction_count": transaction_count,
         }
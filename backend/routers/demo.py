@@ -4,153 +4,211 @@ Demo Router — Development & stress-test seeding endpoints.
 from fastapi import APIRouter, Depends
 from sqlmodel import Session
 from sqlalchemy import text
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import NamedTuple
+import logging
+
+from sqlalchemy.sql.elements import TextClause
 
 from database import engine
 from auth import get_current_user_id
 from helpers import bypass_fk, DEMO_USER_ID
 
+logger = logging.getLogger("korex.demo")
+
 router = APIRouter(prefix="/api", tags=["demo"])
 
 
+# ── Carlos Mendoza stress-test dataset (static) ─────────────────
+
+_SEED_ACCOUNTS = [
+    # name, type, balance, rate, min_pay, due_day, closing_day, vel_target, int_type, debt_sub, orig_amt, term, remaining, credit_lim
+    # (payment_frequency is "monthly" for every seeded account)
+    # === ASSETS (4) ===
+    ("Chase Business Checking", "checking", 12450.00, 0.01, 0, None, None, False, "revolving", "credit_card", None, None, None, None),
+    ("Wells Fargo Personal",    "checking",  3200.00, 0.01, 0, None, None, False, "revolving", "credit_card", None, None, None, None),
+    ("Ally Savings (Emergency)","savings",   8500.00, 4.25, 0, None, None, False, "revolving", "credit_card", None, None, None, None),
+    ("Marcus Savings (Investment)", "savings", 15000.00, 4.40, 0, None, None, False, "revolving", "credit_card", None, None, None, None),
+    # === REVOLVING DEBT (6) ===
+    ("Amex Platinum Business",  "debt", 18500.00, 24.99, 450.00,  5, 28, True,  "revolving", "credit_card", None, None, None, 35000.00),
+    ("Chase Sapphire Reserve",  "debt",  7200.00, 21.49, 180.00, 12,  5, False, "revolving", "credit_card", None, None, None, 25000.00),
+    ("Capital One Venture X",   "debt",  4800.00, 19.99, 120.00, 20, 13, False, "revolving", "credit_card", None, None, None, 15000.00),
+    ("Citi Double Cash",        "debt",  2300.00, 17.49,  60.00, 28, 21, False, "revolving", "credit_card", None, None, None, 10000.00),
+    ("HELOC - Property #2",     "debt", 45000.00,  8.75, 375.00,  1, 25, False, "revolving", "heloc",       None, None, None, 100000.00),
+    ("UIL - Pacific Life",      "debt",     0.00,  5.50,   0.00,  1, None, False, "revolving", "uil",       None, None, None, 75000.00),
+    # === FIXED / AMORTIZED DEBT (7) ===
+    ("Mortgage - Casa Principal","debt", 385000.00, 6.875, 2850.00,  1, None, False, "fixed", "mortgage",    420000.00, 360, 312, None),
+    ("Mortgage - Rental #1",    "debt", 220000.00, 7.25,  1680.00, 15, None, False, "fixed", "mortgage",    250000.00, 360, 288, None),
+    ("Mortgage - Rental #2",    "debt", 175000.00, 7.50,  1395.00, 15, None, False, "fixed", "mortgage",    200000.00, 360, 300, None),
+    ("Tesla Model X Lease",     "debt",  42000.00, 4.99,   780.00, 10, None, False, "fixed", "auto_loan",    65000.00,  72,  48, None),
+    ("Range Rover Sport",       "debt",  35000.00, 5.49,   650.00, 18, None, False, "fixed", "auto_loan",    55000.00,  60,  36, None),
+    ("SBA Business Loan",       "debt",  85000.00, 9.25,  1200.00, 25, None, False, "fixed", "personal_loan",120000.00, 120,  84, None),
+    ("Student Loan (MBA)",      "debt",  28000.00, 5.50,   310.00,  5, None, False, "fixed", "student_loan", 45000.00, 120,  60, None),
+]
+
+_SEED_CASHFLOWS = [
+    # name, amount, category, frequency, is_variable, day_of_month, day_of_week, month_of_year
+    ("LLC Distribution",             8500.00, "income",  "monthly",  False, 1,  None, None),
+    ("W2 Consulting",                4200.00, "income",  "biweekly", False, 15, 4,    None),
+    ("Rental Income #1",             2800.00, "income",  "monthly",  False, 5,  None, None),
+    ("Rental Income #2",             2200.00, "income",  "monthly",  False, 5,  None, None),
+    ("Freelance Projects",           1500.00, "income",  "monthly",  True,  15, None, None),
+    ("Dividends - Brokerage",         350.00, "income",  "monthly",  False, 20, None, None),
+    ("Airbnb Guest Payments",         900.00, "income",  "weekly",   True,  1,  0,    None),
+    ("Annual Bonus",               12000.00, "income",  "annually", False, 15, None, 3),
+    ("Property Tax - Casa",           580.00, "expense", "monthly",  False, 1,  None, None),
+    ("Property Tax - Rental #1",      320.00, "expense", "monthly",  False, 1,  None, None),
+    ("Property Tax - Rental #2",      280.00, "expense", "monthly",  False, 1,  None, None),
+    ("HOA - Rental #1",               250.00, "expense", "monthly",  False, 1,  None, None),
+    ("Insurance Bundle",              890.00, "expense", "monthly",  False, 10, None, None),
+    ("Utilities - All Properties",    420.00, "expense", "monthly",  True,  15, None, None),
+    ("Internet + Phone Bundle",       280.00, "expense", "monthly",  False, 18, None, None),
+    ("Gym + Country Club",            350.00, "expense", "monthly",  False, 1,  None, None),
+    ("Kids School Tuition",          1800.00, "expense", "monthly",  False, 5,  None, None),
+    ("Groceries + Household",         600.00, "expense", "weekly",   True,  1,  5,    None),
+]
+
+_SEED_TRANSACTIONS = [
+    # account name, amount, description, category, days ago
+    ("Chase Business Checking",  8500.00, "LLC Distribution - February",              "salary",    14),
+    ("Chase Business Checking",  4200.00, "W2 Consulting Biweekly",                   "salary",     7),
+    ("Chase Business Checking",  2800.00, "Rental Income - Property #1",              "rental",    10),
+    ("Chase Business Checking",  2200.00, "Rental Income - Property #2",              "rental",    10),
+    ("Amex Platinum Business",    450.00, "Velocity Execution: MIN PAYMENT Amex",     "payment",   20),
+    ("Chase Sapphire Reserve",    180.00, "Velocity Execution: MIN PAYMENT Chase",    "payment",   18),
+    ("Amex Platinum Business",   2500.00, "Velocity Execution: ATTACK Amex Platinum", "payment",   13),
+    ("Chase Business Checking",  -890.00, "Insurance Bundle - All Policies",          "insurance",  5),
+    ("Chase Business Checking", -1800.00, "Kids School Tuition - February",           "education", 10),
+    ("Chase Business Checking",  -600.00, "Groceries - Costco + Whole Foods",         "food",       3),
+    ("Chase Business Checking",   900.00, "Airbnb Guest Payment - Weekend Stay",      "rental",     2),
+    ("Chase Business Checking",  -350.00, "Gym + Country Club Monthly",               "lifestyle",  1),
+]
+
+_SEED_TABLES = ("transactions", "movement_log", "accounts", "cashflow_items")
+
+
+# ── Seed SQL (built once per dialect, reused across calls) ──────
+
+class _SeedSQL(NamedTuple):
+    clear: list[TextClause]
+    acc_insert: TextClause
+    cf_insert: TextClause
+    tx_insert: TextClause
+
+
+@lru_cache(maxsize=4)
+def _seed_sql(dialect: str) -> _SeedSQL:
+    # uid placeholder: PostgreSQL needs CAST, SQLite stores as TEXT
+    uid_expr = "CAST(:uid AS uuid)" if dialect != "sqlite" else ":uid"
+
+    if dialect == "sqlite":
+        clear = [text(f"DELETE FROM {table} WHERE user_id = {uid_expr}") for table in _SEED_TABLES]
+    else:
+        # Postgres: one writable-CTE statement (single round trip, single snapshot).
+        # FK checks (NO ACTION) run at end of statement, so the delete order is irrelevant.
+        clear = [text(
+            "WITH "
+            + ", ".join(
+                f"d_{table} AS (DELETE FROM {table} WHERE user_id = {uid_expr} RETURNING 1)"
+                for table in _SEED_TABLES
+            )
+            + " SELECT 1"
+        )]
+
+    # One multi-row INSERT ... RETURNING → all account ids in a single round trip
+    acc_values = ",\n                ".join(
+        f"({uid_expr}, :name_{i}, :type_{i}, :balance_{i}, :rate_{i}, :min_pay_{i}, "
+        f":due_day_{i}, :closing_day_{i}, :vel_target_{i}, :int_type_{i}, :debt_sub_{i}, "
+        f":orig_amt_{i}, :term_{i}, :remaining_{i}, :credit_lim_{i}, :pay_freq)"
+        for i in range(len(_SEED_ACCOUNTS))
+    )
+    acc_insert = text(f"""
+            INSERT INTO accounts (user_id, name, type, balance, interest_rate, min_payment,
+                due_day, closing_day, is_velocity_target, interest_type, debt_subtype,
+                original_amount, loan_term_months, remaining_months, credit_limit,
+                payment_frequency)
+            VALUES {acc_values}
+            RETURNING id, name
+        """)
+
+    cf_insert = text(f"""
+            INSERT INTO cashflow_items (user_id, name, amount, category, frequency,
+                is_variable, day_of_month, day_of_week, month_of_year,
+                account_id, is_income)
+            VALUES ({uid_expr}, :name, :amount, :category, :freq,
+                :is_var, :dom, :dow, :moy,
+                :acc_id, :is_inc)
+        """)
+
+    tx_insert = text(f"""
+            INSERT INTO transactions (user_id, account_id, amount, description, category, date)
+            VALUES ({uid_expr}, :acc_id, :amount, :desc, :cat, :dt)
+        """)
+
+    return _SeedSQL(clear, acc_insert, cf_insert, tx_insert)
+
+
 @router.post("/dev/seed-stress-test")
-async def seed_stress_test(user_id: str = Depends(get_current_user_id)):
-    """Seed Carlos Mendoza stress-test dataset."""
-    try:
-        return _seed_impl(user_id)
-    except Exception as e:
-        import traceback
-        return {"status": "error", "detail": str(e), "tb": traceback.format_exc()}
+def seed_stress_test(user_id: str = Depends(get_current_user_id)):
+    """Load the Carlos Mendoza stress-test dataset for the caller.
+
+    Runs inline (plain `def` → threadpool) — a handful of batched statements —
+    so a failed seed reaches the client as an error instead of a silent 202.
+    """
+    result = _seed_impl(user_id)
+    logger.info(f"Demo seed complete for {user_id}: {result['summary']}")
+    return result
 
 
 def _seed_impl(user_id: str):
     with Session(engine) as session:
         uid = user_id
-        dialect = engine.dialect.name  # session.bind is None in SQLAlchemy 2.x
-
-        # uid placeholder: PostgreSQL needs CAST, SQLite stores as TEXT
-        uid_expr = "CAST(:uid AS uuid)" if dialect != "sqlite" else ":uid"
+        sql = _seed_sql(engine.dialect.name)  # session.bind is None in SQLAlchemy 2.x
+
+        acc_params = {"uid": uid, "pay_freq": "monthly"}  # NOT NULL, no DB-side default
+        for i, a in enumerate(_SEED_ACCOUNTS):
+            acc_params.update({
+                f"name_{i}": a[0], f"type_{i}": a[1],
+                f"balance_{i}": a[2], f"rate_{i}": a[3], f"min_pay_{i}": a[4],
+                f"due_day_{i}": a[5], f"closing_day_{i}": a[6], f"vel_target_{i}": a[7],
+                f"int_type_{i}": a[8], f"debt_sub_{i}": a[9],
+                f"orig_amt_{i}": a[10], f"term_{i}": a[11], f"remaining_{i}": a[12],
+                f"credit_lim_{i}": a[13],
+            })
 
         # ── 1 + 2. CLEAR + INSERT inside bypass_fk so FK checks don't block ──
-        accounts_data = [
-            # name, type, balance, rate, min_pay, due_day, closing_day, vel_target, int_type, debt_sub, orig_amt, term, remaining, credit_lim
-            # === ASSETS (4) ===
-            ("Chase Business Checking", "checking", 12450.00, 0.01, 0, None, None, False, "revolving", "credit_card", None, None, None, None),
-            ("Wells Fargo Personal",    "checking",  3200.00, 0.01, 0, None, None, False, "revolving", "credit_card", None, None, None, None),
-            ("Ally Savings (Emergency)","savings",   8500.00, 4.25, 0, None, None, False, "revolving", "credit_card", None, None, None, None),
-            ("Marcus Savings (Investment)", "savings", 15000.00, 4.40, 0, None, None, False, "revolving", "credit_card", None, None, None, None),
-            # === REVOLVING DEBT (6) ===
-            ("Amex Platinum Business",  "debt", 18500.00, 24.99, 450.00,  5, 28, True,  "revolving", "credit_card", None, None, None, 35000.00),
-            ("Chase Sapphire Reserve",  "debt",  7200.00, 21.49, 180.00, 12,  5, False, "revolving", "credit_card", None, None, None, 25000.00),
-            ("Capital One Venture X",   "debt",  4800.00, 19.99, 120.00, 20, 13, False, "revolving", "credit_card", None, None, None, 15000.00),
-            ("Citi Double Cash",        "debt",  2300.00, 17.49,  60.00, 28, 21, False, "revolving", "credit_card", None, None, None, 10000.00),
-            ("HELOC - Property #2",     "debt", 45000.00,  8.75, 375.00,  1, 25, False, "revolving", "heloc",       None, None, None, 100000.00),
-            ("UIL - Pacific Life",      "debt",     0.00,  5.50,   0.00,  1, None, False, "revolving", "uil",       None, None, None, 75000.00),
-            # === FIXED / AMORTIZED DEBT (7) ===
-            ("Mortgage - Casa Principal","debt", 385000.00, 6.875, 2850.00,  1, None, False, "fixed", "mortgage",    420000.00, 360, 312, None),
-            ("Mortgage - Rental #1",    "debt", 220000.00, 7.25,  1680.00, 15, None, False, "fixed", "mortgage",    250000.00, 360, 288, None),
-            ("Mortgage - Rental #2",    "debt", 175000.00, 7.50,  1395.00, 15, None, False, "fixed", "mortgage",    200000.00, 360, 300, None),
-            ("Tesla Model X Lease",     "debt",  42000.00, 4.99,   780.00, 10, None, False, "fixed", "auto_loan",    65000.00,  72,  48, None),
-            ("Range Rover Sport",       "debt",  35000.00, 5.49,   650.00, 18, None, False, "fixed", "auto_loan",    55000.00,  60,  36, None),
-            ("SBA Business Loan",       "debt",  85000.00, 9.25,  1200.00, 25, None, False, "fixed", "personal_loan",120000.00, 120,  84, None),
-            ("Student Loan (MBA)",      "debt",  28000.00, 5.50,   310.00,  5, None, False, "fixed", "student_loan", 45000.00, 120,  60, None),
-        ]
-
-        acc_insert = text(f"""
-            INSERT INTO accounts (user_id, name, type, balance, interest_rate, min_payment,
-                due_day, closing_day, is_velocity_target, interest_type, debt_subtype,
-                original_amount, loan_term_months, remaining_months, credit_limit)
-            VALUES ({uid_expr}, :name, :type, :balance, :rate, :min_pay,
-                :due_day, :closing_day, :vel_target, :int_type, :debt_sub,
-                :orig_amt, :term, :remaining, :credit_lim)
-            RETURNING id, name
-        """)
-
-        acc_map = {}
         with bypass_fk(session):
             # Clear existing demo data first
-            for table in ("transactions", "movement_log", "accounts", "cashflow_items"):
-                session.execute(text(f"DELETE FROM {table} WHERE user_id = {uid_expr}"), {"uid": uid})
-
-            for a in accounts_data:
-                result = session.execute(acc_insert, {
-                    "uid": uid, "name": a[0], "type": a[1],
-                    "balance": a[2], "rate": a[3], "min_pay": a[4],
-                    "due_day": a[5], "closing_day": a[6], "vel_target": a[7],
-                    "int_type": a[8], "debt_sub": a[9],
-                    "orig_amt": a[10], "term": a[11], "remaining": a[12],
-                    "credit_lim": a[13],
-                })
-                row = result.fetchone()
-                acc_map[row[1]] = row[0]
+            for stmt in sql.clear:
+                session.execute(stmt, {"uid": uid})
+
+            acc_map = {name: acc_id for acc_id, name in session.execute(sql.acc_insert, acc_params)}
 
             # ── 3. CASHFLOW ITEMS ──
             checking_id = acc_map.get("Chase Business Checking")
 
-            cf_insert = text(f"""
-                INSERT INTO cashflow_items (user_id, name, amount, category, frequency,
-                    is_variable, day_of_month, day_of_week, month_of_year,
-                    account_id, is_income)
-                VALUES ({uid_expr}, :name, :amount, :category, :freq,
-                    :is_var, :dom, :dow, :moy,
-                    :acc_id, :is_inc)
-            """)
-
-            cashflows_data = [
-                ("LLC Distribution",             8500.00, "income",  "monthly",  False, 1,  None, None),
-                ("W2 Consulting",                4200.00, "income",  "biweekly", False, 15, 4,    None),
-                ("Rental Income #1",             2800.00, "income",  "monthly",  False, 5,  None, None),
-                ("Rental Income #2",             2200.00, "income",  "monthly",  False, 5,  None, None),
-                ("Freelance Projects",           1500.00, "income",  "monthly",  True,  15, None, None),
-                ("Dividends - Brokerage",         350.00, "income",  "monthly",  False, 20, None, None),
-                ("Airbnb Guest Payments",         900.00, "income",  "weekly",   True,  1,  0,    None),
-                ("Annual Bonus",               12000.00, "income",  "annually", False, 15, None, 3),
-                ("Property Tax - Casa",           580.00, "expense", "monthly",  False, 1,  None, None),
-                ("Property Tax - Rental #1",      320.00, "expense", "monthly",  False, 1,  None, None),
-                ("Property Tax - Rental #2",      280.00, "expense", "monthly",  False, 1,  None, None),
-                ("HOA - Rental #1",               250.00, "expense", "monthly",  False, 1,  None, None),
-                ("Insurance Bundle",              890.00, "expense", "monthly",  False, 10, None, None),
-                ("Utilities - All Properties",    420.00, "expense", "monthly",  True,  15, None, None),
-                ("Internet + Phone Bundle",       280.00, "expense", "monthly",  False, 18, None, None),
-                ("Gym + Country Club",            350.00, "expense", "monthly",  False, 1,  None, None),
-                ("Kids School Tuition",          1800.00, "expense", "monthly",  False, 5,  None, None),
-                ("Groceries + Household",         600.00, "expense", "weekly",   True,  1,  5,    None),
-            ]
-
-            for cf in cashflows_data:
-                session.execute(cf_insert, {
+            # executemany: one execute() call for the whole batch
+            session.execute(sql.cf_insert, [
+                {
                     "uid": uid, "name": cf[0], "amount": cf[1], "category": cf[2],
                     "freq": cf[3], "is_var": cf[4], "dom": cf[5], "dow": cf[6], "moy": cf[7],
                     "acc_id": checking_id, "is_inc": cf[2] == "income",
-                })
+                }
+                for cf in _SEED_CASHFLOWS
+            ])
 
             # ── 4. HISTORICAL TRANSACTIONS ──
-            today = datetime.now()
-            tx_insert = text(f"""
-                INSERT INTO transactions (user_id, account_id, amount, description, category, date)
-                VALUES ({uid_expr}, :acc_id, :amount, :desc, :cat, :dt)
-            """)
-
-            transactions_data = [
-                (acc_map.get("Chase Business Checking"),  8500.00, "LLC Distribution - February",              "salary",    14),
-                (acc_map.get("Chase Business Checking"),  4200.00, "W2 Consulting Biweekly",                   "salary",     7),
-                (acc_map.get("Chase Business Checking"),  2800.00, "Rental Income - Property #1",              "rental",    10),
-                (acc_map.get("Chase Business Checking"),  2200.00, "Rental Income - Property #2",              "rental",    10),
-                (acc_map.get("Amex Platinum Business"),    450.00, "Velocity Execution: MIN PAYMENT Amex",     "payment",   20),
-                (acc_map.get("Chase Sapphire Reserve"),    180.00, "Velocity Execution: MIN PAYMENT Chase",    "payment",   18),
-                (acc_map.get("Amex Platinum Business"),   2500.00, "Velocity Execution: ATTACK Amex Platinum", "payment",   13),
-                (acc_map.get("Chase Business Checking"),  -890.00, "Insurance Bundle - All Policies",          "insurance",  5),
-                (acc_map.get("Chase Business Checking"), -1800.00, "Kids School Tuition - February",           "education", 10),
-                (acc_map.get("Chase Business Checking"),  -600.00, "Groceries - Costco + Whole Foods",         "food",       3),
-                (acc_map.get("Chase Business Checking"),   900.00, "Airbnb Guest Payment - Weekend Stay",      "rental",     2),
-                (acc_map.get("Chase Business Checking"),  -350.00, "Gym + Country Club Monthly",               "lifestyle",  1),
-            ]
-
-            for tx in transactions_data:
-                session.execute(tx_insert, {
-                    "uid": uid, "acc_id": tx[0], "amount": tx[1], "desc": tx[2],
-                    "cat": tx[3], "dt": (today - timedelta(days=tx[4])).strftime("%Y-%m-%d"),
-                })
+            # transactions.date is an ISO text column: date.isoformat() gives the same
+            # YYYY-MM-DD string as strftime without the format-string parse per row.
+            today = date.today()
+            session.execute(sql.tx_insert, [
+                {
+                    "uid": uid, "acc_id": acc_map.get(tx[0]), "amount": tx[1], "desc": tx[2],
+                    "cat": tx[3], "dt": (today - timedelta(days=tx[4])).isoformat(),
+                }
+                for tx in _SEED_TRANSACTIONS
+            ])
 
         session.commit()
 
@@ -158,10 +216,10 @@ def _seed_impl(user_id: str):
         "status": "success",
         "message": "Carlos Mendoza Stress Test loaded",
         "summary": {
-            "accounts": len(accounts_data),
-            "cashflows": len(cashflows_data),
-            "transactions": len(transactions_data),
-            "total_debt": sum(a[2] for a in accounts_data if a[1] == "debt"),
-            "total_assets": sum(a[2] for a in accounts_data if a[1] in ["checking", "savings"]),
+            "accounts": len(_SEED_ACCOUNTS),
+            "cashflows": len(_SEED_CASHFLOWS),
+            "transactions": len(_SEED_TRANSACTIONS),
+            "total_debt": sum(a[2] for a in _SEED_ACCOUNTS if a[1] == "debt"),
+            "total_assets": sum(a[2] for a in _SEED_ACCOUNTS if a[1] in ["checking", "savings"]),
         },
     }
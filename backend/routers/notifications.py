@@ -10,6 +10,7 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends
 from sqlmodel import Session, select
+from sqlalchemy import case, func
 
 from database import get_session
 from auth import get_current_user_id
@@ -19,9 +20,22 @@ logger = logging.getLogger("korex.notifications")
 
 router = APIRouter(prefix="/api/notifications", tags=["notifications"])
 
+# Columns read by /upcoming, in row order — fetched as plain tuples, never as CashflowItem models
+_UPCOMING_COLUMNS = (
+    CashflowItem.id,
+    CashflowItem.name,
+    CashflowItem.amount,
+    CashflowItem.day_of_month,
+    CashflowItem.is_income,
+    Account.name.label("account_name"),
+)
+
+# Handlers are plain `def`: they only do blocking (sync Session) DB work, so FastAPI
+# runs them in its threadpool instead of stalling the event loop.
+
 
 @router.get("/upcoming")
-async def get_upcoming_payments(
+def get_upcoming_payments(
     days: int = 7,
     user_id: str = Depends(get_current_user_id),
     session: Session = Depends(get_session),
@@ -33,41 +47,38 @@ async def get_upcoming_payments(
     today = date.today()
     current_day = today.day
 
-    # Get all active cashflow items for this user
-    items = session.exec(
-        select(CashflowItem).where(CashflowItem.user_id == user_id)
+    # Days until next due date: this month if still ahead, else next month (approximate, 30d)
+    days_until = case(
+        (CashflowItem.day_of_month >= current_day, CashflowItem.day_of_month - current_day),
+        else_=(30 - current_day) + CashflowItem.day_of_month,
+    )
+
+    # Only the columns we report, with the linked account name; the due-window
+    # filter and urgency sort (soonest first) run in SQL — one query, plain Row tuples
+    rows = session.exec(
+        select(*_UPCOMING_COLUMNS, days_until)
+        .join(Account, Account.id == CashflowItem.account_id, isouter=True)
+        .where(
+            CashflowItem.user_id == user_id,
+            CashflowItem.day_of_month.is_not(None),
+            days_until <= days,
+        )
+        .order_by(days_until)
     ).all()
 
-    upcoming = []
-    for item in items:
-        due_day: int = item.day_of_month
-        if due_day is None:
-            continue
-
-        # Calculate next due date
-        if due_day >= current_day:
-            # Due this month
-            days_until = due_day - current_day
-        else:
-            # Due next month (approximate)
-            days_until = (30 - current_day) + due_day
-
-        if days_until <= days:
-            # Fetch associated account name
-            account = session.get(Account, item.account_id) if item.account_id else None
-            upcoming.append({
-                "id": item.id,
-                "name": item.name,
-                "amount": float(item.amount),
-                "due_day": due_day,
-                "days_until": days_until,
-                "account_name": account.name if account else None,
-                "is_income": item.is_income,
-                "is_overdue": days_until < 0,
-            })
-
-    # Sort by urgency (soonest first)
-    upcoming.sort(key=lambda x: x["days_until"])
+    upcoming = [
+        {
+            "id": item_id,
+            "name": name,
+            "amount": float(amount),
+            "due_day": due_day,
+            "days_until": item_days_until,
+            "account_name": account_name,
+            "is_income": is_income,
+            "is_overdue": item_days_until < 0,
+        }
+        for item_id, name, amount, due_day, is_income, account_name, item_days_until in rows
+    ]
 
     return {
         "upcoming": upcoming,
@@ -77,7 +88,7 @@ async def get_upcoming_payments(
 
 
 @router.get("/summary")
-async def get_notification_summary(
+def get_notification_summary(
     user_id: str = Depends(get_current_user_id),
     session: Session = Depends(get_session),
 ):
@@ -85,29 +96,36 @@ async def get_notification_summary(
     Returns a daily/weekly summary of financial activity.
     Used for daily digest and weekly report notifications.
     """
-    accounts = session.exec(
-        select(Account).where(Account.user_id == user_id)
-    ).all()
-
-    total_debt = sum(float(a.balance) for a in accounts if a.account_type == "liability")
-    total_liquid = sum(float(a.balance) for a in accounts if a.account_type == "asset")
-    net_worth = total_liquid - abs(total_debt)
-
-    # Count accounts with upcoming payments
-    items = session.exec(
-        select(CashflowItem).where(CashflowItem.user_id == user_id)
-    ).all()
     today = date.today()
-    due_soon = sum(
-        1 for item in items
-        if item.day_of_month and 0 <= (item.day_of_month - today.day) <= 3
+
+    # One round trip: account totals + count, with due-soon items as a scalar subquery
+    due_soon_q = (
+        select(func.count())
+        .select_from(CashflowItem)
+        .where(
+            CashflowItem.user_id == user_id,
+            CashflowItem.day_of_month.between(today.day, today.day + 3),
+        )
+        .scalar_subquery()
     )
+    total_debt, total_liquid, accounts_count, due_soon = session.exec(
+        select(
+            func.coalesce(func.sum(case((Account.type == "debt", Account.balance), else_=0)), 0),
+            func.coalesce(func.sum(case((Account.type != "debt", Account.balance), else_=0)), 0),
+            func.count(Account.id),
+            due_soon_q,
+        ).where(Account.user_id == user_id)
+    ).one()
+
+    total_debt = float(total_debt)
+    total_liquid = float(total_liquid)
+    net_worth = total_liquid - abs(total_debt)
 
     return {
         "total_debt": total_debt,
         "total_liquid": total_liquid,
         "net_worth": net_worth,
-        "accounts_count": len(accounts),
+        "accounts_count": accounts_count,
         "payments_due_soon": due_soon,
         "date": today.isoformat(),
     }
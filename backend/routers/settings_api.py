@@ -4,10 +4,12 @@ Persists user-level flags in the user_settings table.
 """
 from fastapi import APIRouter, Depends
 from sqlmodel import Session, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from pydantic import BaseModel
 import logging
 
-from database import engine
+from database import get_session
 from models import UserSettings
 from helpers import bypass_fk
 from auth import get_current_user_id
@@ -21,39 +23,42 @@ class SettingsUpdate(BaseModel):
     onboarding_complete: bool | None = None
 
 
-def _get_or_create(session: Session, user_id: str) -> UserSettings:
-    """Upsert pattern: return existing row or create a new one."""
-    settings = session.exec(
-        select(UserSettings).where(UserSettings.user_id == user_id)
-    ).first()
-    if not settings:
-        settings = UserSettings(user_id=user_id)
-        with bypass_fk(session):
-            session.add(settings)
-            session.commit()
-        session.refresh(settings)
-    return settings
+# Dialect-specific INSERT constructs — both support ON CONFLICT ... DO UPDATE ... RETURNING
+_UPSERT_INSERT = {"postgresql": pg_insert, "sqlite": sqlite_insert}
 
 
 @router.get("/settings")
-async def get_settings(user_id: str = Depends(get_current_user_id)):
-    with Session(engine) as session:
-        settings = _get_or_create(session, user_id)
-        return {
-            "onboarding_complete": settings.onboarding_complete,
-        }
+def get_settings(
+    user_id: str = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
+    # Read-only: a missing row just means defaults — it is created on first PATCH
+    settings = session.exec(
+        select(UserSettings).where(UserSettings.user_id == user_id)
+    ).first()
+    return {
+        "onboarding_complete": settings.onboarding_complete if settings else False,
+    }
 
 
 @router.patch("/settings")
-async def update_settings(body: SettingsUpdate, user_id: str = Depends(get_current_user_id)):
-    with Session(engine) as session:
-        settings = _get_or_create(session, user_id)
-        if body.onboarding_complete is not None:
-            settings.onboarding_complete = body.onboarding_complete
-        with bypass_fk(session):
-            session.add(settings)
-            session.commit()
-        session.refresh(settings)
-        return {
-            "onboarding_complete": settings.onboarding_complete,
-        }
+def update_settings(
+    body: SettingsUpdate,
+    user_id: str = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
+    # One round trip: create the row if missing, otherwise update only the fields sent
+    values = body.model_dump(exclude_none=True)
+    insert = _UPSERT_INSERT[session.get_bind().dialect.name]
+    stmt = insert(UserSettings).values(user_id=user_id, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserSettings.user_id],
+        # An empty PATCH still needs a (no-op) SET so RETURNING yields the existing row
+        set_=values or {"onboarding_complete": UserSettings.onboarding_complete},
+    ).returning(UserSettings.onboarding_complete)
+    with bypass_fk(session):
+        onboarding_complete = session.execute(stmt).scalar_one()
+        session.commit()
+    return {
+        "onboarding_complete": onboarding_complete,
+    }
@@ -2,55 +2,72 @@
 Strategy Router — Velocity banking, Peace Shield, tactical GPS,
 command center, purchase simulator, and cashflow intelligence.
 """
+import logging
+
 from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlmodel import Session, select
+from sqlalchemy import bindparam, func
 from decimal import Decimal, ROUND_HALF_UP
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from typing import List
+from dataclasses import dataclass
 
 from database import engine
 from models import Account, CashflowItem, Transaction, User, MovementLog
 from schemas import MovementExecute, SimulatorRequest
-from helpers import bypass_fk, accounts_to_debt_objects, accounts_to_active_debt_objects
+from helpers import (
+    bypass_fk, accounts_to_debt_objects, accounts_to_active_debt_objects,
+    get_shield_target, invalidate_shield_target, cached_debt_alerts, cached_projections,
+    velocity_power,
+)
 from auth import get_current_user_id
-
-import sys, os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from responses import KoreXJSONResponse
 from core_engine.calculators import calculate_minimum_payment
 
 from velocity_engine import (
     DebtAccount, CashflowTactical, VelocityWeapon,
-    get_projections, get_velocity_target, get_peace_shield_status,
+    get_peace_shield_status,
     calculate_safe_attack_equity, simulate_freedom_path,
     generate_action_plan, calculate_purchase_time_cost,
-    detect_debt_alerts,
     detect_float_kill_opportunities, get_closing_day_intelligence,
     get_hybrid_kill_target, detect_interest_rate_arbitrage,
     calculate_risky_opportunity,
-    DEFAULT_PEACE_SHIELD,
 )
 from transaction_classifier import classify_transaction, classify_batch, get_cashflow_summary
 
+logger = logging.getLogger("korex.execute")
+
 router = APIRouter(prefix="/api", tags=["strategy"])
 
+# Statements shared by most endpoints, built once at import; the user id is bound
+# per call (session.exec(..., params={"uid": user_id})) so the SQL cache key is stable
+_ACCOUNTS_BY_USER = select(Account).where(Account.user_id == bindparam("uid"))
+_CASHFLOWS_BY_USER = select(CashflowItem).where(CashflowItem.user_id == bindparam("uid"))
+
+# Handlers are plain `def`: they do blocking (sync Session) DB work and CPU-bound
+# simulations, so FastAPI runs them in its threadpool instead of stalling the event loop.
+
 
 # ── PEACE SHIELD ───────────────────────────────────────────────
 
 @router.get("/peace-shield")
-async def get_peace_shield_data(user_id: str = Depends(get_current_user_id)):
+def get_peace_shield_data(user_id: str = Depends(get_current_user_id)):
     with Session(engine) as session:
-        user = session.exec(select(User)).first()
-        shield_target = user.shield_target if user else DEFAULT_PEACE_SHIELD
-        accounts = session.exec(select(Account).where(Account.user_id == user_id)).all()
-        liquid_cash = sum(acc.balance for acc in accounts if acc.type in ["checking", "savings"])
-        return get_peace_shield_status(Decimal(str(liquid_cash)), shield_target)
+        shield_target = get_shield_target(session)
+        # Only the liquid total is needed — sum it in SQL instead of loading accounts
+        liquid_cash = session.exec(
+            select(func.coalesce(func.sum(Account.balance), 0))
+            .where(Account.user_id == user_id, Account.type.in_(["checking", "savings"]))
+        ).one()
+        return get_peace_shield_status(liquid_cash, shield_target)
 
 
 @router.put("/user/me/shield")
-def update_shield_target(data: dict):
+def update_shield_target(data: dict, user_id: str = Depends(get_current_user_id)):
     target = data.get("target", 5000)
     with Session(engine) as session:
-        user = session.exec(select(User)).first()
+        # users holds the single global settings row — fetch at most one
+        user = session.exec(select(User).limit(1)).first()
         if not user:
             user = User(email="user@korex.io", shield_target=Decimal(str(target)))
             session.add(user)
@@ -58,65 +75,69 @@ def update_shield_target(data: dict):
             user.shield_target = Decimal(str(target))
             session.add(user)
         session.commit()
+        invalidate_shield_target()
         return {"ok": True}
 
 
-# ── VELOCITY PROJECTIONS ───────────────────────────────────────
+# ── SHARED DEBT CONTEXT ───────────────────────────────────────
 
-@router.get("/velocity/projections")
-async def get_velocity_projections(
+@dataclass
+class DebtContext:
+    """Inputs shared by the projection/simulation endpoints."""
+    debts: List[DebtAccount]
+    liquid_cash: Decimal
+
+
+def debt_context(
     user_id: str = Depends(get_current_user_id),
     plan_limit: int | None = Query(None, description="Max active debt accounts per subscription plan"),
-):
-    """Calculate real velocity banking projections from account data."""
+) -> DebtContext:
+    """Load the user's accounts once → active (plan-limited) debts + liquid cash."""
     with Session(engine) as session:
-        accounts = session.exec(select(Account).where(Account.user_id == user_id)).all()
-        debts = accounts_to_active_debt_objects(accounts, plan_limit)
-        liquid_cash = sum(acc.balance for acc in accounts if acc.type != "debt")
-        return get_projections(debts, Decimal(str(liquid_cash)))
+        accounts = session.exec(_ACCOUNTS_BY_USER, params={"uid": user_id}).all()
+    return DebtContext(
+        debts=accounts_to_active_debt_objects(accounts, plan_limit),
+        liquid_cash=sum((acc.balance for acc in accounts if acc.type != "debt"), Decimal("0")),
+    )
+
+
+# ── VELOCITY PROJECTIONS ───────────────────────────────────────
+
+@router.get("/velocity/projections")
+def get_velocity_projections(ctx: DebtContext = Depends(debt_context)):
+    """Calculate real velocity banking projections from account data."""
+    return cached_projections(ctx.debts, ctx.liquid_cash)
 
 
 @router.get("/velocity/freedom-path")
-async def get_freedom_path(
-    user_id: str = Depends(get_current_user_id),
-    plan_limit: int | None = Query(None, description="Max active debt accounts per subscription plan"),
-):
+def get_freedom_path(ctx: DebtContext = Depends(debt_context)):
     """Get the month-by-month freedom path simulation."""
-    with Session(engine) as session:
-        accounts = session.exec(select(Account).where(Account.user_id == user_id)).all()
-        debts = accounts_to_active_debt_objects(accounts, plan_limit)
-        liquid_cash = sum(acc.balance for acc in accounts if acc.type != "debt")
-        velocity_amount = (Decimal(str(liquid_cash)) * Decimal('0.20')).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        return simulate_freedom_path(debts, velocity_amount)
+    velocity_amount = velocity_power(ctx.liquid_cash)
+    return simulate_freedom_path(ctx.debts, velocity_amount)
 
 
 @router.get("/velocity/simulate")
-async def get_simulation(
+def get_simulation(
     extra_cash: float,
-    user_id: str = Depends(get_current_user_id),
-    plan_limit: int | None = Query(None, description="Max active debt accounts per subscription plan"),
+    ctx: DebtContext = Depends(debt_context),
 ):
     """Simulate payoff with custom extra monthly cash."""
-    with Session(engine) as session:
-        accounts = session.exec(select(Account).where(Account.user_id == user_id)).all()
-        debts = accounts_to_active_debt_objects(accounts, plan_limit)
-        liquid_cash = sum(acc.balance for acc in accounts if acc.type != "debt")
-        base_velocity = (Decimal(str(liquid_cash)) * Decimal('0.20')).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        total_monthly_power = base_velocity + Decimal(str(extra_cash))
-        return simulate_freedom_path(debts, total_monthly_power)
+    base_velocity = velocity_power(ctx.liquid_cash)
+    total_monthly_power = base_velocity + Decimal(str(extra_cash))
+    return simulate_freedom_path(ctx.debts, total_monthly_power)
 
 
 # ── TACTICAL GPS & EXECUTION ──────────────────────────────────
 
 @router.get("/strategy/tactical-gps")
-async def get_tactical_gps(
+def get_tactical_gps(
     user_id: str = Depends(get_current_user_id),
     plan_limit: int | None = Query(None, description="Max active debt accounts per subscription plan"),
 ):
     """Generate a 2-month action plan with impact metrics."""
     with Session(engine) as session:
-        accounts = session.exec(select(Account).where(Account.user_id == user_id)).all()
-        cashflows = session.exec(select(CashflowItem).where(CashflowItem.user_id == user_id)).all()
+        accounts = session.exec(_ACCOUNTS_BY_USER, params={"uid": user_id}).all()
+        cashflows = session.exec(_CASHFLOWS_BY_USER, params={"uid": user_id}).all()
         debts = accounts_to_active_debt_objects(accounts, plan_limit)
 
         cf_tactical = [
@@ -129,31 +150,34 @@ async def get_tactical_gps(
             for cf in cashflows
         ]
 
-        checking_balance = sum(acc.balance for acc in accounts if acc.type == "checking")
-
-        # Dynamic Funding Source Selection
-        asset_accounts = [acc for acc in accounts if acc.type in ["checking", "savings"] and acc.balance > 0]
-        asset_accounts.sort(key=lambda x: x.balance, reverse=True)
-        funding_name = asset_accounts[0].name if asset_accounts else "Checking"
+        # One pass over accounts: liquid/checking totals, funding candidates and
+        # velocity weapons (HELOCs/UILs with available credit)
+        liquid_cash = Decimal("0")
+        checking_balance = Decimal("0")
+        asset_accounts = []
+        weapons = []
+        for acc in accounts:
+            if acc.type == "debt":
+                if acc.debt_subtype in ("heloc", "uil") and (acc.credit_limit or 0) > acc.balance:
+                    weapons.append(VelocityWeapon(
+                        name=acc.name,
+                        balance=acc.balance,
+                        credit_limit=acc.credit_limit or Decimal("0"),
+                        interest_rate=acc.interest_rate,
+                        weapon_type=acc.debt_subtype or "heloc",
+                    ))
+                continue
+            liquid_cash += acc.balance
+            if acc.type == "checking":
+                checking_balance += acc.balance
+            if acc.type in ("checking", "savings") and acc.balance > 0:
+                asset_accounts.append(acc)
+
+        # Dynamic Funding Source Selection (largest funded asset account)
+        funding_name = max(asset_accounts, key=lambda x: x.balance).name if asset_accounts else "Checking"
 
         # Get User Shield Target
-        user = session.exec(select(User)).first()
-        shield_target = user.shield_target if user else DEFAULT_PEACE_SHIELD
-
-        # Detect Velocity Weapons (HELOCs/UILs with available credit)
-        weapons = [
-            VelocityWeapon(
-                name=acc.name,
-                balance=Decimal(str(acc.balance)),
-                credit_limit=Decimal(str(acc.credit_limit or 0)),
-                interest_rate=Decimal(str(acc.interest_rate)),
-                weapon_type=acc.debt_subtype or "heloc",
-            )
-            for acc in accounts
-            if acc.type == "debt"
-            and acc.debt_subtype in ("heloc", "uil")
-            and (acc.credit_limit or 0) > acc.balance
-        ]
+        shield_target = get_shield_target(session)
 
         movements = generate_action_plan(debts, cf_tactical, checking_balance, funding_name, shield_target, weapons)
 
@@ -162,17 +186,16 @@ async def get_tactical_gps(
             {
                 "name": w.name,
                 "weapon_type": w.weapon_type,
-                "balance": float(w.balance),
-                "credit_limit": float(w.credit_limit),
-                "available_credit": float(w.available_credit),
-                "interest_rate": float(w.interest_rate),
+                "balance": w.balance,
+                "credit_limit": w.credit_limit,
+                "available_credit": w.available_credit,
+                "interest_rate": w.interest_rate,
             }
             for w in weapons
         ]
 
         # Freedom date projections (reuse existing engine function)
-        liquid_cash = sum(acc.balance for acc in accounts if acc.type != "debt")
-        projections = get_projections(debts, Decimal(str(liquid_cash)))
+        projections = cached_projections(debts, liquid_cash)
 
         return {
             "movements": movements,
@@ -185,37 +208,42 @@ async def get_tactical_gps(
 
 
 @router.post("/strategy/execute")
-async def execute_movement(data: MovementExecute, user_id: str = Depends(get_current_user_id)):
+def execute_movement(data: MovementExecute, user_id: str = Depends(get_current_user_id)):
     """Executes a tactical movement by creating a transaction and UPDATING BALANCES.
 
     Includes fuzzy account name matching as fallback for cases where the
     Action Plan generates slightly different names than what's stored in DB.
     """
-    import logging
-    logger = logging.getLogger("korex.execute")
-
     with Session(engine) as session:
         amount = Decimal(str(data.amount))
 
         # Load ALL user accounts once for efficient matching
-        all_accounts = session.exec(
-            select(Account).where(Account.user_id == user_id)
-        ).all()
+        all_accounts = session.exec(_ACCOUNTS_BY_USER, params={"uid": user_id}).all()
+
+        # Case-fold names once; setdefault keeps the first account on duplicate names
+        by_name: dict[str, Account] = {}
+        by_folded_name: dict[str, Account] = {}
+        lowered_names = []
+        for acc in all_accounts:
+            lowered = acc.name.lower()
+            by_name.setdefault(acc.name, acc)
+            by_folded_name.setdefault(lowered.strip(), acc)
+            lowered_names.append((lowered, acc))
 
         def find_account(name: str) -> Account | None:
             """Try exact match first, then case-insensitive, then partial match."""
             # 1. Exact match
-            for acc in all_accounts:
-                if acc.name == name:
-                    return acc
+            acc = by_name.get(name)
+            if acc is not None:
+                return acc
             # 2. Case-insensitive match
             name_lower = name.lower().strip()
-            for acc in all_accounts:
-                if acc.name.lower().strip() == name_lower:
-                    return acc
+            acc = by_folded_name.get(name_lower)
+            if acc is not None:
+                return acc
             # 3. Partial match (name contains or is contained by)
-            for acc in all_accounts:
-                if name_lower in acc.name.lower() or acc.name.lower() in name_lower:
+            for lowered, acc in lowered_names:
+                if name_lower in lowered or lowered in name_lower:
                     return acc
             return None
 
@@ -303,7 +331,7 @@ async def execute_movement(data: MovementExecute, user_id: str = Depends(get_cur
 
 
 @router.get("/strategy/executed-logs")
-async def get_executed_logs(user_id: str = Depends(get_current_user_id)):
+def get_executed_logs(user_id: str = Depends(get_current_user_id)):
     """Retrieve all logged strategic movements for current user."""
     with Session(engine) as session:
         return session.exec(select(MovementLog).where(MovementLog.user_id == user_id)).all()
@@ -312,59 +340,83 @@ async def get_executed_logs(user_id: str = Depends(get_current_user_id)):
 # ── PURCHASE SIMULATOR ────────────────────────────────────────
 
 @router.post("/simulator/time-cost")
-async def simulate_purchase_cost(
+def simulate_purchase_cost(
     req: SimulatorRequest,
-    user_id: str = Depends(get_current_user_id),
-    plan_limit: int | None = Query(None, description="Max active debt accounts per subscription plan"),
+    ctx: DebtContext = Depends(debt_context),
 ):
     """Calculate how many days a purchase delays freedom."""
     if req.amount <= 0:
         raise HTTPException(status_code=400, detail="Amount must be positive.")
 
-    with Session(engine) as session:
-        accounts = session.exec(select(Account).where(Account.user_id == user_id)).all()
-        debts = accounts_to_active_debt_objects(accounts, plan_limit)
-        liquid_cash = sum(acc.balance for acc in accounts if acc.type != "debt")
-        extra_monthly = (Decimal(str(liquid_cash)) * Decimal('0.20')).quantize(Decimal('0.01'))
-        return calculate_purchase_time_cost(Decimal(str(req.amount)), debts, extra_monthly)
+    extra_monthly = velocity_power(ctx.liquid_cash)
+    return calculate_purchase_time_cost(Decimal(str(req.amount)), ctx.debts, extra_monthly)
 
 
 # ── TRANSACTION CLASSIFIER ────────────────────────────────────
 
-@router.get("/transactions/classified")
-async def get_classified_transactions(limit: int = 50, user_id: str = Depends(get_current_user_id)):
+@router.get("/transactions/classified", response_class=KoreXJSONResponse)
+def get_classified_transactions(
+    limit: int = Query(50, ge=1, le=500),
+    user_id: str = Depends(get_current_user_id),
+):
     """Return transactions with smart tags (income/debt/life)."""
     with Session(engine) as session:
-        txs = session.exec(
-            select(Transaction).where(Transaction.user_id == user_id).order_by(Transaction.date.desc()).limit(limit)
-        ).all()
-        raw = [
-            {"id": tx.id, "account_id": tx.account_id, "amount": float(tx.amount),
-             "date": tx.date, "name": tx.description, "category": tx.category}
-            for tx in txs
-        ]
-        return classify_batch(raw)
-
-
-@router.get("/cashflow/summary")
-async def get_cashflow_intelligence(user_id: str = Depends(get_current_user_id)):
+        rows = session.exec(
+            select(
+                Transaction.id, Transaction.account_id, Transaction.amount,
+                Transaction.date, Transaction.description, Transaction.category,
+            ).where(Transaction.user_id == user_id).order_by(Transaction.date.desc()).limit(limit)
+        )
+        # Feed rows straight into the classifier — no intermediate list of dicts
+        return KoreXJSONResponse(classify_batch(
+            {"id": tx_id, "account_id": account_id, "amount": float(amount),
+             "date": tx_date, "name": description, "category": category}
+            for tx_id, account_id, amount, tx_date, description, category in rows
+        ))
+
+
+@router.get("/cashflow/summary", response_class=KoreXJSONResponse)
+def get_cashflow_intelligence(user_id: str = Depends(get_current_user_id)):
     """Return the AI-classified cashflow summary."""
     with Session(engine) as session:
-        txs = session.exec(
-            select(Transaction).where(Transaction.user_id == user_id).order_by(Transaction.date.desc()).limit(100)
-        ).all()
-        raw = [
-            {"amount": float(tx.amount), "name": tx.description, "category": tx.category}
-            for tx in txs
-        ]
-        classified = classify_batch(raw)
-        return get_cashflow_summary(classified)
+        rows = session.exec(
+            select(Transaction.amount, Transaction.description, Transaction.category)
+            .where(Transaction.user_id == user_id).order_by(Transaction.date.desc()).limit(100)
+        )
+        classified = classify_batch(
+            {"amount": float(amount), "name": description, "category": category}
+            for amount, description, category in rows
+        )
+        return KoreXJSONResponse(get_cashflow_summary(classified))
 
 
 # ── STRATEGY COMMAND CENTER ───────────────────────────────────
 
-@router.get("/strategy/command-center")
-async def get_strategy_command_center(
+STREAK_MAX_MONTHS = 24
+
+
+def _attack_streak(executed_dates, today: date) -> int:
+    """Consecutive months (ending this month, max 24) with at least one attack.
+
+    Each attack month sets bit `months_ago` (0 = this month) in a 24-bit mask,
+    using integer month arithmetic — no strftime or December rollover. The
+    streak is then the run of trailing 1-bits.
+    """
+    current = today.year * 12 + today.month
+    mask = 0
+    for d in executed_dates:
+        # Skip empty/malformed values (the old string comparison tolerated them too)
+        if not d or len(d) < 7 or not (d[:4].isdigit() and d[5:7].isdigit()):
+            continue
+        months_ago = current - (int(d[:4]) * 12 + int(d[5:7]))
+        if 0 <= months_ago < STREAK_MAX_MONTHS:
+            mask |= 1 << months_ago
+    # mask + 1 carries through the trailing ones; the lowest 0-bit's position is the run length
+    return (~mask & (mask + 1)).bit_length() - 1
+
+
+@router.get("/strategy/command-center", response_class=KoreXJSONResponse)
+def get_strategy_command_center(
     user_id: str = Depends(get_current_user_id),
     plan_limit: int | None = Query(None, description="Max active debt accounts per subscription plan"),
 ):
@@ -375,13 +427,21 @@ async def get_strategy_command_center(
     """
     with Session(engine) as session:
         # --- 1. Load all user accounts ---
-        accounts = session.exec(select(Account).where(Account.user_id == user_id)).all()
-        user = session.exec(select(User)).first()
-        shield_target = user.shield_target if user else DEFAULT_PEACE_SHIELD
+        accounts = session.exec(_ACCOUNTS_BY_USER, params={"uid": user_id}).all()
+        shield_target = get_shield_target(session)
 
         debt_accounts = accounts_to_active_debt_objects(accounts, plan_limit)
-        liquid_cash = sum(acc.balance for acc in accounts if acc.type != "debt")
-        liquid_cash_dec = Decimal(str(liquid_cash))
+
+        # One pass over the non-debt accounts: liquid total + funded asset accounts
+        # (reused by the arbitrage scan and the risky-opportunity source pick)
+        liquid_cash_dec = Decimal('0')
+        asset_accounts = []
+        for acc in accounts:
+            if acc.type == "debt":
+                continue
+            liquid_cash_dec += acc.balance
+            if acc.type in ("checking", "savings") and acc.balance > 0:
+                asset_accounts.append(acc)
 
         # --- 2. Shield status ---
         shield = get_peace_shield_status(liquid_cash_dec, shield_target)
@@ -391,7 +451,9 @@ async def get_strategy_command_center(
         attack_amount = safety_data["safe_equity"]
 
         # --- 4. Velocity Target (Avalanche) ---
-        target = get_velocity_target(debt_accounts)
+        # debt_accounts holds only positive balances, already sorted by APR desc
+        # (stable → same pick as get_velocity_target's max())
+        target = debt_accounts[0] if debt_accounts else None
 
         # --- 5. Morning Briefing ---
         morning_briefing = None
@@ -412,8 +474,8 @@ async def get_strategy_command_center(
                     total_gap_cost += shortfall
                     gap_debts.append({
                         "name": d.name,
-                        "shortfall": float(shortfall),
-                        "apr": float(d.interest_rate),
+                        "shortfall": shortfall,
+                        "apr": d.interest_rate,
                     })
 
             # Effective attack = total extra minus gap coverage
@@ -445,41 +507,41 @@ async def get_strategy_command_center(
                 )
 
             morning_briefing = {
-                "available_cash": float(liquid_cash_dec),
-                "attack_amount": float(attack_amount),
+                "available_cash": liquid_cash_dec,
+                "attack_amount": attack_amount,
                 "shield_status": {
                     "percentage": shield.get("fill_percentage", 0),
                     "is_active": shield.get("is_active", False),
                     "health": shield.get("health", "unknown"),
                 },
                 "recommended_action": {
-                    "amount": float(effective_attack),
+                    "amount": effective_attack,
                     "destination": target.name,
-                    "destination_apr": float(target.interest_rate),
-                    "destination_balance": float(target.balance),
-                    "daily_cost": float(daily_interest),
+                    "destination_apr": target.interest_rate,
+                    "destination_balance": target.balance,
+                    "daily_cost": daily_interest,
                     "reason": reason,
                     "gap_coverage": {
-                        "total_cost": float(total_gap_cost),
+                        "total_cost": total_gap_cost,
                         "debts": gap_debts,
                     } if total_gap_cost > 0 else None,
                 },
                 "impact": {
                     "days_accelerated": days_accelerated,
-                    "interest_saved_monthly": float(interest_saved_monthly),
-                    "freedom_hours_earned": float(freedom_hours),
+                    "interest_saved_monthly": interest_saved_monthly,
+                    "freedom_hours_earned": freedom_hours,
                 },
             }
 
         # --- 6. Confidence Meter (all debts ranked) ---
         confidence_meter = {"debts_ranked": [], "strategy": "avalanche", "explanation": ""}
         if debt_accounts:
-            ranked = sorted(debt_accounts, key=lambda d: d.interest_rate, reverse=True)
+            ranked = debt_accounts  # already in APR-descending order
             confidence_meter["debts_ranked"] = [
                 {
-                    "name": d.name, "apr": float(d.interest_rate),
-                    "balance": float(d.balance),
-                    "daily_cost": float((d.balance * (d.interest_rate / Decimal('100'))) / Decimal('365')),
+                    "name": d.name, "apr": d.interest_rate,
+                    "balance": d.balance,
+                    "daily_cost": (d.balance * (d.interest_rate / Decimal('100'))) / Decimal('365'),
                     "is_target": (target and d.name == target.name),
                 }
                 for d in ranked
@@ -493,15 +555,14 @@ async def get_strategy_command_center(
                 )
 
         # --- 7. Freedom Counter ---
-        projections = get_projections(debt_accounts, liquid_cash_dec)
+        projections = cached_projections(debt_accounts, liquid_cash_dec)
 
         # Accurate days recovered = actual date diff (standard - velocity)
         std_date_str = projections.get("standard_debt_free_date", "N/A")
         vel_date_str = projections.get("velocity_debt_free_date", "N/A")
         try:
-            from datetime import datetime as _dt
-            std_dt = _dt.fromisoformat(std_date_str)
-            vel_dt = _dt.fromisoformat(vel_date_str)
+            std_dt = datetime.fromisoformat(std_date_str)
+            vel_dt = datetime.fromisoformat(vel_date_str)
             days_recovered = max(0, (std_dt - vel_dt).days)
         except (ValueError, TypeError):
             days_recovered = projections.get("months_saved", 0) * 30
@@ -516,31 +577,14 @@ async def get_strategy_command_center(
         }
 
         # --- 8. Attack Streak ---
-        executed_logs = session.exec(
-            select(MovementLog)
+        # Only the execution dates are needed (count + streak) — no MovementLog hydration
+        executed_dates = session.exec(
+            select(MovementLog.date_executed)
             .where(MovementLog.status.in_(["executed", "verified"]), MovementLog.user_id == user_id)
-            .order_by(MovementLog.date_executed.desc())
         ).all()
 
-        total_attacks = len(executed_logs)
-        current_streak = 0
-        if executed_logs:
-            months_with_attacks = set()
-            for log in executed_logs:
-                if log.date_executed:
-                    months_with_attacks.add(log.date_executed[:7])
-
-            check_date = date.today().replace(day=1)
-            for _ in range(24):
-                month_key = check_date.strftime("%Y-%m")
-                if month_key in months_with_attacks:
-                    current_streak += 1
-                    if check_date.month == 1:
-                        check_date = date(check_date.year - 1, 12, 1)
-                    else:
-                        check_date = date(check_date.year, check_date.month - 1, 1)
-                else:
-                    break
+        total_attacks = len(executed_dates)
+        current_streak = _attack_streak(executed_dates, date.today())
 
         streak = {"current": current_streak, "total_attacks": total_attacks}
 
@@ -571,19 +615,19 @@ async def get_strategy_command_center(
                 "options": [
                     {
                         "id": "attack", "label": "Full Attack",
-                        "amount": float(attack_amount),
+                        "amount": attack_amount,
                         "impact": f"Save ${full_attack_savings:.2f}/mo in interest",
                         "description": f"Apply all to {target.name}",
                     },
                     {
                         "id": "shield", "label": "Boost Shield",
-                        "amount": float(attack_amount),
+                        "amount": attack_amount,
                         "impact": f"Shield reaches {float(shield_boost_pct):.0f}%",
                         "description": "Strengthen your emergency fund",
                     },
                     {
                         "id": "split", "label": "Balanced Split",
-                        "amount": float(attack_amount),
+                        "amount": attack_amount,
                         "impact": f"Save ${split_savings:.2f}/mo + boost shield",
                         "description": "50% attack, 50% safety",
                     },
@@ -592,7 +636,7 @@ async def get_strategy_command_center(
             }
 
         # --- 10. Debt Health Alerts ---
-        debt_alerts = detect_debt_alerts(debt_accounts)
+        debt_alerts = cached_debt_alerts(debt_accounts)
 
         # --- 11. Float Kill Opportunities (Credit Card Grace Period) ---
         float_kills = detect_float_kill_opportunities(debt_accounts, attack_amount)
@@ -610,8 +654,7 @@ async def get_strategy_command_center(
                 "balance": float(acc.balance),
                 "apy": float(acc.apy) if acc.apy else 0.5,
             }
-            for acc in accounts
-            if acc.type in ("checking", "savings") and acc.balance > 0
+            for acc in asset_accounts
         ]
         arbitrage_alerts = detect_interest_rate_arbitrage(savings_for_arbitrage, debt_accounts)
 
@@ -619,16 +662,14 @@ async def get_strategy_command_center(
         # Only calculate when no safe attack is available
         risky_opportunity = None
         if morning_briefing is None:
-            # Find the best source account name for execution
-            asset_accounts = [acc for acc in accounts if acc.type in ("checking", "savings") and acc.balance > 0]
-            asset_accounts.sort(key=lambda x: x.balance, reverse=True)
-            source_name = asset_accounts[0].name if asset_accounts else "Checking"
+            # Find the best source account name for execution (largest funded asset account)
+            source_name = max(asset_accounts, key=lambda x: x.balance).name if asset_accounts else "Checking"
 
             risky_opportunity = calculate_risky_opportunity(
                 liquid_cash_dec, shield_target, debt_accounts, source_name
             )
 
-        return {
+        return KoreXJSONResponse({
             "morning_briefing": morning_briefing,
             "confidence_meter": confidence_meter,
             "freedom_counter": freedom_counter,
@@ -640,5 +681,5 @@ async def get_strategy_command_center(
             "hybrid_kill_analysis": hybrid_analysis,
             "arbitrage_alerts": arbitrage_alerts,
             "risky_opportunity": risky_opportunity,
-        }
+        })
 
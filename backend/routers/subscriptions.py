@@ -9,28 +9,47 @@ Endpoints:
 """
 import os
 import hmac
+import random
+import asyncio
 import hashlib
 import logging
-from typing import Optional
+from types import MappingProxyType
+from typing import Optional, Union
 from datetime import datetime
+from itertools import accumulate
 
 import httpx
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import JSONResponse
 from sqlmodel import Session, select
-from pydantic import BaseModel
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from pydantic import BaseModel, Field, ValidationError
 
+from cache import TTLCache
 from database import get_session
 from auth import get_current_user_id
-from models import Subscription
+from models import Account, Subscription
+from responses import KoreXJSONResponse
 
 logger = logging.getLogger("korex.subscriptions")
 
-router = APIRouter(prefix="/api/subscriptions", tags=["subscriptions"])
+# Every handler renders through orjson (Decimal-aware) unless it returns its own Response
+router = APIRouter(
+    prefix="/api/subscriptions",
+    tags=["subscriptions"],
+    default_response_class=KoreXJSONResponse,
+)
 
 # ── Config (env vars) ────────────────────────────────────────
 LS_API_KEY = os.getenv("LEMONSQUEEZY_API_KEY", "")
 LS_WEBHOOK_SECRET = os.getenv("LEMONSQUEEZY_WEBHOOK_SECRET", "")
+LS_WEBHOOK_SECRET_BYTES = LS_WEBHOOK_SECRET.encode("utf-8")  # HMAC key, encoded once
+_WEBHOOK_VERIFY_ENABLED = bool(LS_WEBHOOK_SECRET)  # unset in local dev → signature check skipped
+# Keyed once: the inner/outer pad state is computed here and each webhook works on
+# a .copy() of it, so verification only hashes the body itself
+_WEBHOOK_HMAC = hmac.new(LS_WEBHOOK_SECRET_BYTES, digestmod=hashlib.sha256)
 LS_STORE_ID = os.getenv("LEMONSQUEEZY_STORE_ID", "")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "https://korex-financial.vercel.app")
 
@@ -52,8 +71,64 @@ PLAN_VARIANTS = {
     },
 }
 
+# Reverse map variant_id → plan, built once (unset/empty variant IDs are skipped)
+_VARIANT_TO_PLAN = {
+    variant_id: plan_name
+    for plan_name, variants in PLAN_VARIANTS.items()
+    for variant_id in variants.values()
+    if variant_id
+}
+
+# (plan, billing_cycle) → variant_id, so checkout validation is a single lookup
+_VARIANT_BY_KEY = {
+    (plan_name, billing_cycle): variant_id
+    for plan_name, variants in PLAN_VARIANTS.items()
+    for billing_cycle, variant_id in variants.items()
+    if variant_id
+}
+
+# Accounts each plan's strategy covers (top N by APR) and its annual price —
+# read-only module constants shared by /status and /savings-estimate
+PLAN_LIMITS = MappingProxyType({
+    "starter": 12,
+    "velocity": 6,
+    "accelerator": 12,
+    "freedom": 999,  # "Unlimited"
+})
+PLAN_COSTS_ANNUAL = MappingProxyType({
+    "starter": 0,
+    "velocity": 96.99,
+    "accelerator": 196.99,
+    "freedom": 346.99,
+})
+# /status also recognises the developer license (not a sellable plan)
+_ACCOUNT_LIMITS = MappingProxyType({**PLAN_LIMITS, "freedom-dev": 999})
+
+# /status payloads per user — the row only changes through the webhook/promo
+# writers below, which drop the user's entry; the TTL bounds staleness across workers
+_STATUS_CACHE = TTLCache(ttl_seconds=60, maxsize=50000)
+
+# Velocity banking typically accelerates payoff by 35-60%
+# We use a conservative 40% acceleration factor
+VELOCITY_ACCELERATION = 0.40
+
+# Zero estimates for users with no debt data
+_EMPTY_PLAN = MappingProxyType({
+    "annual_savings": 0,
+    "monthly_savings": 0,
+    "daily_interest_burning": 0,
+    "roi_days": 999,
+    "years_without": 30,
+    "years_with": 30,
+    "total_interest_without": 0,
+    "total_interest_with": 0,
+})
+
 LS_API_BASE = "https://api.lemonsqueezy.com/v1"
 
+# Dialect-specific INSERT constructs — both support ON CONFLICT ... DO UPDATE
+_UPSERT_INSERT = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
 
 def _ls_headers() -> dict:
     """Standard headers for Lemon Squeezy API calls."""
@@ -64,6 +139,60 @@ def _ls_headers() -> dict:
     }
 
 
+# Shared client: keep-alive connections (TCP + TLS) to the LS API are pooled and
+# reused across checkouts instead of re-handshaking on every request. HTTP/2
+# (needs the `h2` package, via httpx[http2]) multiplexes concurrent checkouts
+# over a single connection.
+_ls_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_ls_client() -> httpx.AsyncClient:
+    """Lazily create the module-level Lemon Squeezy client (auth headers baked in)."""
+    global _ls_client
+    if _ls_client is None or _ls_client.is_closed:
+        _ls_client = httpx.AsyncClient(
+            base_url=LS_API_BASE,
+            headers=_ls_headers(),
+            timeout=15.0,
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+                keepalive_expiry=60.0,
+            ),
+        )
+    return _ls_client
+
+
+@router.on_event("shutdown")
+async def _close_ls_client():
+    if _ls_client is not None:
+        await _ls_client.aclose()
+
+
+# Failures where the request never reached LS (no connection / connect timeout),
+# so resending cannot create a duplicate checkout. LS documents no idempotency
+# keys, so anything that may have been sent (read timeouts, 5xx) is not retried.
+_LS_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+_LS_MAX_ATTEMPTS = 3
+
+
+async def _ls_post(path: str, payload: dict) -> httpx.Response:
+    """POST to the LS API, retrying only connect failures with jittered exponential backoff.
+
+    Up to 3 attempts when the connection could not be established; every
+    response (2xx, 4xx, 5xx) and every other error is returned/raised as is.
+    """
+    for attempt in range(_LS_MAX_ATTEMPTS):
+        try:
+            return await _get_ls_client().post(path, json=payload)
+        except _LS_RETRYABLE_ERRORS as e:
+            if attempt == _LS_MAX_ATTEMPTS - 1:
+                raise
+            logger.warning(f"LS POST {path} failed ({type(e).__name__}), retrying (attempt {attempt + 1})")
+        await asyncio.sleep(0.5 * 2 ** attempt + random.random() * 0.25)
+
+
 # ── Schemas ──────────────────────────────────────────────────
 class CheckoutRequest(BaseModel):
     plan: str          # velocity | accelerator | freedom
@@ -72,12 +201,39 @@ class CheckoutRequest(BaseModel):
     name: Optional[str] = None
 
 
-class CheckoutResponse(BaseModel):
-    checkout_url: str
+# Webhook body — only the fields the handlers read are declared; everything
+# else in the (often multi-KB) LS payload is skipped while parsing
+class _WebhookURLs(BaseModel):
+    update_payment_method: Optional[str] = None
+    customer_portal: Optional[str] = None
+
+
+class _WebhookAttributes(BaseModel):
+    variant_id: Union[int, str, None] = None
+    status: Optional[str] = None
+    customer_id: Union[int, str, None] = None
+    renews_at: Optional[str] = None
+    ends_at: Optional[str] = None
+    urls: _WebhookURLs = Field(default_factory=_WebhookURLs)
+
+
+class _WebhookData(BaseModel):
+    id: Union[int, str] = ""
+    attributes: _WebhookAttributes = Field(default_factory=_WebhookAttributes)
+
+
+class _WebhookMeta(BaseModel):
+    event_name: str = ""
+    custom_data: dict = Field(default_factory=dict)
+
+
+class _WebhookBody(BaseModel):
+    meta: _WebhookMeta = Field(default_factory=_WebhookMeta)
+    data: _WebhookData = Field(default_factory=_WebhookData)
 
 
 # ── POST /checkout — Create Lemon Squeezy checkout ──────────
-@router.post("/checkout", response_model=CheckoutResponse)
+@router.post("/checkout")
 async def create_checkout(
     body: CheckoutRequest,
     user_id: str = Depends(get_current_user_id),
@@ -89,12 +245,11 @@ async def create_checkout(
         )
 
     # Validate plan + billing cycle
-    plan_variants = PLAN_VARIANTS.get(body.plan)
-    if not plan_variants:
-        raise HTTPException(status_code=400, detail=f"Unknown plan: {body.plan}")
-
-    variant_id = plan_variants.get(body.billing_cycle)
+    variant_id = _VARIANT_BY_KEY.get((body.plan, body.billing_cycle))
     if not variant_id:
+        # Error path only: tell an unknown plan apart from an unconfigured variant
+        if body.plan not in PLAN_VARIANTS:
+            raise HTTPException(status_code=400, detail=f"Unknown plan: {body.plan}")
         raise HTTPException(
             status_code=400,
             detail=f"No variant configured for {body.plan}/{body.billing_cycle}",
@@ -133,13 +288,7 @@ async def create_checkout(
     }
 
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{LS_API_BASE}/checkouts",
-                json=payload,
-                headers=_ls_headers(),
-                timeout=15.0,
-            )
+        resp = await _ls_post("/checkouts", payload)
 
         if resp.status_code not in (200, 201):
             logger.error(f"LS checkout failed: {resp.status_code} — {resp.text}")
@@ -148,50 +297,141 @@ async def create_checkout(
                 detail="Failed to create checkout session. Please try again.",
             )
 
-        data = resp.json()
-        checkout_url = data["data"]["attributes"]["url"]
+        checkout_url = resp.json()["data"]["attributes"]["url"]
         logger.info(f"Checkout created for user={user_id} plan={body.plan}/{body.billing_cycle}")
-        return CheckoutResponse(checkout_url=checkout_url)
+        return {"checkout_url": checkout_url}
 
     except httpx.HTTPError as e:
         logger.error(f"LS API connection error: {e}")
         raise HTTPException(status_code=502, detail="Payment service unreachable.")
 
 
+# ── Webhook event handlers ───────────────────────────────────
+# Each takes (session, user_id, event_name, attrs: _WebhookAttributes, ls_subscription_id, plan_name, now)
+def _handle_upsert_active(session, user_id, event_name, attrs, ls_subscription_id, plan_name, now):
+    _upsert_subscription(
+        session=session,
+        now=now,
+        user_id=user_id,
+        plan=plan_name,
+        status=attrs.status or "active",
+        ls_subscription_id=ls_subscription_id,
+        ls_customer_id=_str_or_empty(attrs.customer_id),
+        current_period_end=attrs.renews_at,
+        update_payment_method_url=attrs.urls.update_payment_method,
+        customer_portal_url=attrs.urls.customer_portal,
+    )
+    logger.info(f"Subscription upserted: user={user_id} plan={plan_name} status={attrs.status}")
+
+
+def _handle_cancelled(session, user_id, event_name, attrs, ls_subscription_id, plan_name, now):
+    _upsert_subscription(
+        session=session,
+        now=now,
+        user_id=user_id,
+        plan=plan_name,
+        status=attrs.status or "cancelled",
+        ls_subscription_id=ls_subscription_id,
+        ls_customer_id=_str_or_empty(attrs.customer_id),
+        current_period_end=attrs.ends_at,
+    )
+    logger.info(f"Subscription cancelled/expired: user={user_id}")
+
+
+def _handle_payment_failed(session, user_id, event_name, attrs, ls_subscription_id, plan_name, now):
+    _upsert_subscription(
+        session=session,
+        now=now,
+        user_id=user_id,
+        plan=plan_name,
+        status="past_due",
+        ls_subscription_id=ls_subscription_id,
+        ls_customer_id=_str_or_empty(attrs.customer_id),
+    )
+    logger.warning(f"Payment failed: user={user_id}")
+
+
+def _handle_payment_success(session, user_id, event_name, attrs, ls_subscription_id, plan_name, now):
+    # Re-activate on successful payment — a conditional UPDATE, no SELECT first
+    result = session.execute(
+        update(Subscription)
+        .where(Subscription.user_id == user_id, Subscription.status == "past_due")
+        .values(status="active", updated_at=now.isoformat())
+    )
+    session.commit()
+    _STATUS_CACHE.discard(user_id)
+    if result.rowcount:
+        logger.info(f"Payment recovered, subscription reactivated: user={user_id}")
+
+
+def _handle_order_created(session, user_id, event_name, attrs, ls_subscription_id, plan_name, now):
+    # One-time orders (if you ever sell non-subscription products)
+    logger.info(f"Order created for user={user_id}")
+
+
+def _handle_unhandled(session, user_id, event_name, attrs, ls_subscription_id, plan_name, now):
+    logger.info(f"Unhandled webhook event: {event_name}")
+
+
+# event_name → handler, built once; anything else falls through to _handle_unhandled
+_EVENT_HANDLERS = {
+    "subscription_created": _handle_upsert_active,
+    "subscription_updated": _handle_upsert_active,
+    "subscription_resumed": _handle_upsert_active,
+    "subscription_unpaused": _handle_upsert_active,
+    "subscription_cancelled": _handle_cancelled,
+    "subscription_expired": _handle_cancelled,
+    "subscription_payment_failed": _handle_payment_failed,
+    "subscription_payment_success": _handle_payment_success,
+    "subscription_payment_recovered": _handle_payment_success,
+    "order_created": _handle_order_created,
+}
+
+
 # ── POST /webhook — Lemon Squeezy webhook receiver ──────────
 @router.post("/webhook")
 async def handle_webhook(request: Request, session: Session = Depends(get_session)):
     """
     Receives webhook events from Lemon Squeezy.
     No auth required — validated via HMAC signature.
+    The event's DB write (a single upsert/UPDATE) runs before the response, so a
+    failure surfaces as a 5xx and LS redelivers the event.
     """
+    received_at = datetime.utcnow()  # one timestamp for every write this event makes
     raw_body = await request.body()
 
     # ── Verify signature ─────────────────────────────────────
-    if LS_WEBHOOK_SECRET:
+    if _WEBHOOK_VERIFY_ENABLED:
         signature = request.headers.get("X-Signature", "")
-        expected = hmac.new(
-            LS_WEBHOOK_SECRET.encode("utf-8"),
-            raw_body,
-            hashlib.sha256,
-        ).hexdigest()
+        # Cheap format check first: anything that isn't a hex SHA-256 digest
+        # (32 bytes) is rejected without hashing the body
+        try:
+            signature_bytes = bytes.fromhex(signature)
+        except ValueError:
+            signature_bytes = b""
+        if len(signature_bytes) != hashlib.sha256().digest_size:
+            logger.warning("Webhook signature malformed — rejecting request")
+            return JSONResponse(status_code=403, content={"error": "Invalid signature"})
+
+        mac = _WEBHOOK_HMAC.copy()
+        mac.update(raw_body)
+        expected = mac.digest()
 
-        if not hmac.compare_digest(expected, signature):
+        if not hmac.compare_digest(expected, signature_bytes):
             logger.warning("Webhook signature mismatch — rejecting request")
             return JSONResponse(status_code=403, content={"error": "Invalid signature"})
 
     # ── Parse event ──────────────────────────────────────────
-    import json
     try:
-        payload = json.loads(raw_body)
-    except json.JSONDecodeError:
+        # Parses the raw bytes straight into the declared fields, no decode step
+        payload = _WebhookBody.model_validate_json(raw_body)
+    except ValidationError:
         return JSONResponse(status_code=400, content={"error": "Invalid JSON"})
 
-    event_name = payload.get("meta", {}).get("event_name", "")
-    custom_data = payload.get("meta", {}).get("custom_data", {})
-    user_id = custom_data.get("user_id")
-    data_attrs = payload.get("data", {}).get("attributes", {})
-    ls_subscription_id = str(payload.get("data", {}).get("id", ""))
+    event_name = payload.meta.event_name
+    user_id = payload.meta.custom_data.get("user_id")
+    attrs = payload.data.attributes
+    ls_subscription_id = str(payload.data.id)
 
     logger.info(f"Webhook received: event={event_name} user_id={user_id} ls_sub={ls_subscription_id}")
 
@@ -200,64 +440,11 @@ async def handle_webhook(request: Request, session: Session = Depends(get_sessio
         return JSONResponse(status_code=200, content={"ok": True, "warning": "no user_id"})
 
     # ── Map LS variant to plan name ──────────────────────────
-    variant_id = str(data_attrs.get("variant_id", ""))
-    plan_name = _variant_to_plan(variant_id)
+    plan_name = _variant_to_plan(_str_or_empty(attrs.variant_id))
 
     # ── Handle event ─────────────────────────────────────────
-    if event_name in ("subscription_created", "subscription_updated", "subscription_resumed", "subscription_unpaused"):
-        _upsert_subscription(
-            session=session,
-            user_id=user_id,
-            plan=plan_name,
-            status=data_attrs.get("status", "active"),
-            ls_subscription_id=ls_subscription_id,
-            ls_customer_id=str(data_attrs.get("customer_id", "")),
-            current_period_end=data_attrs.get("renews_at"),
-            update_payment_method_url=data_attrs.get("urls", {}).get("update_payment_method"),
-            customer_portal_url=data_attrs.get("urls", {}).get("customer_portal"),
-        )
-        logger.info(f"Subscription upserted: user={user_id} plan={plan_name} status={data_attrs.get('status')}")
-
-    elif event_name in ("subscription_cancelled", "subscription_expired"):
-        _upsert_subscription(
-            session=session,
-            user_id=user_id,
-            plan=plan_name,
-            status=data_attrs.get("status", "cancelled"),
-            ls_subscription_id=ls_subscription_id,
-            ls_customer_id=str(data_attrs.get("customer_id", "")),
-            current_period_end=data_attrs.get("ends_at"),
-        )
-        logger.info(f"Subscription cancelled/expired: user={user_id}")
-
-    elif event_name == "subscription_payment_failed":
-        _upsert_subscription(
-            session=session,
-            user_id=user_id,
-            plan=plan_name,
-            status="past_due",
-            ls_subscription_id=ls_subscription_id,
-            ls_customer_id=str(data_attrs.get("customer_id", "")),
-        )
-        logger.warning(f"Payment failed: user={user_id}")
-
-    elif event_name in ("subscription_payment_success", "subscription_payment_recovered"):
-        # Re-activate on successful payment
-        existing = session.exec(
-            select(Subscription).where(Subscription.user_id == user_id)
-        ).first()
-        if existing and existing.status == "past_due":
-            existing.status = "active"
-            session.add(existing)
-            session.commit()
-            logger.info(f"Payment recovered, subscription reactivated: user={user_id}")
-
-    elif event_name == "order_created":
-        # One-time orders (if you ever sell non-subscription products)
-        logger.info(f"Order created for user={user_id}")
-
-    else:
-        logger.info(f"Unhandled webhook event: {event_name}")
+    handler = _EVENT_HANDLERS.get(event_name, _handle_unhandled)
+    handler(session, user_id, event_name, attrs, ls_subscription_id, plan_name, received_at)
 
     return JSONResponse(status_code=200, content={"ok": True})
 
@@ -268,9 +455,18 @@ async def get_subscription_status(
     user_id: str = Depends(get_current_user_id),
     session: Session = Depends(get_session),
 ):
-    sub = session.exec(
-        select(Subscription).where(Subscription.user_id == user_id)
-    ).first()
+    cached = _STATUS_CACHE.get(user_id)
+    if cached is not None:
+        return cached
+
+    status = _load_subscription_status(session, user_id)
+    _STATUS_CACHE.set(user_id, status)
+    return status
+
+
+def _load_subscription_status(session: Session, user_id: str) -> dict:
+    """Build the /status payload from the DB, applying the expiration guard."""
+    sub = _get_subscription(session, user_id)
 
     if not sub:
         return {
@@ -306,18 +502,10 @@ async def get_subscription_status(
         except (ValueError, TypeError):
             pass  # Malformed date — skip check, don't block user
 
-    plan_limits = {
-        "starter": 12,
-        "velocity": 6,
-        "accelerator": 12,
-        "freedom": 999,  # "Unlimited"
-        "freedom-dev": 999,  # Developer license
-    }
-
     return {
         "plan": sub.plan,
         "status": sub.status,
-        "accounts_limit": plan_limits.get(sub.plan, 2),
+        "accounts_limit": _ACCOUNT_LIMITS.get(sub.plan, 2),
         "customer_portal_url": sub.customer_portal_url,
         "current_period_end": sub.current_period_end,
         "ls_subscription_id": sub.ls_subscription_id,
@@ -330,9 +518,7 @@ async def get_customer_portal(
     user_id: str = Depends(get_current_user_id),
     session: Session = Depends(get_session),
 ):
-    sub = session.exec(
-        select(Subscription).where(Subscription.user_id == user_id)
-    ).first()
+    sub = _get_subscription(session, user_id)
 
     if not sub or not sub.customer_portal_url:
         raise HTTPException(status_code=404, detail="No active subscription found")
@@ -351,86 +537,66 @@ async def get_savings_estimate(
     Uses interest differentials between minimum-payment and velocity strategies.
     This powers the neuromarketing UI on the pricing page.
     """
-    from models import Account
-    from decimal import Decimal
-
-    # Fetch all user's liability accounts (debts with interest)
-    accounts = session.exec(
-        select(Account).where(
-            Account.user_id == user_id,
-            Account.type == "debt",
-        )
-    ).all()
-
-    if not accounts:
+    # User's liability accounts (debts with interest)
+    debt_filter = (Account.user_id == user_id, Account.type == "debt")
+
+    # Portfolio-wide totals in one aggregate round trip (all debts, not just a plan's top N)
+    accounts_count, total_balance, total_weighted_rate = session.exec(
+        select(
+            func.count(),
+            func.coalesce(func.sum(Account.balance), 0),
+            func.coalesce(func.sum(Account.balance * Account.interest_rate), 0),
+        ).where(*debt_filter)
+    ).one()
+
+    if not accounts_count:
         # Return zero estimates for users with no debt data
-        empty_plan = {
-            "annual_savings": 0,
-            "monthly_savings": 0,
-            "daily_interest_burning": 0,
-            "roi_days": 999,
-            "years_without": 30,
-            "years_with": 30,
-            "total_interest_without": 0,
-            "total_interest_with": 0,
-        }
-        return {
+        return KoreXJSONResponse({
             "has_data": False,
             "total_debt": 0,
             "daily_interest_all": 0,
             "plans": {
-                "starter": {**empty_plan, "accounts_used": 0, "plan_cost_annual": 0},
-                "velocity": {**empty_plan, "accounts_used": 0, "plan_cost_annual": 96.99},
-                "accelerator": {**empty_plan, "accounts_used": 0, "plan_cost_annual": 196.99},
-                "freedom": {**empty_plan, "accounts_used": 0, "plan_cost_annual": 346.99},
+                plan_name: {**_EMPTY_PLAN, "accounts_used": 0, "plan_cost_annual": plan_cost}
+                for plan_name, plan_cost in PLAN_COSTS_ANNUAL.items()
             },
             "social_proof": {
-                "total_accounts_monitored": len(accounts),
+                "total_accounts_monitored": 0,
                 "total_debt_tracked": 0,
             },
-        }
+        })
 
-    # Sort accounts by interest rate descending (highest APR = most impactful)
-    sorted_accounts = sorted(
-        accounts,
-        key=lambda a: float(a.interest_rate or 0),
-        reverse=True,
-    )
+    # Per-account balance/APR for the largest plan's top N — only the two columns
+    # used, sorted by APR descending (highest APR = most impactful; ties keep
+    # insertion order) so each plan's top N is a prefix
+    accounts = session.exec(
+        select(Account.balance, Account.interest_rate)
+        .where(*debt_filter)
+        .order_by(Account.interest_rate.desc(), Account.id)
+        .limit(max(PLAN_LIMITS.values()))
+    ).all()
 
-    plan_limits = {
-        "starter": 12,
-        "velocity": 6,
-        "accelerator": 12,
-        "freedom": 999,
-    }
-    plan_costs_annual = {
-        "starter": 0,
-        "velocity": 96.99,
-        "accelerator": 196.99,
-        "freedom": 346.99,
-    }
+    balances = [float(a.balance or 0) for a in accounts]
+    rates = [float(a.interest_rate or 0) for a in accounts]
+    annual_interest = [b * r / 100 for b, r in zip(balances, rates)]
 
-    # Velocity banking typically accelerates payoff by 35-60%
-    # We use a conservative 40% acceleration factor
-    VELOCITY_ACCELERATION = 0.40
+    # Running totals over the APR-sorted accounts: every plan takes the top N,
+    # so its sums are a single index into these instead of a fresh pass per plan
+    cum_balance = list(accumulate(balances))
+    cum_rate = list(accumulate(rates))
+    cum_annual = list(accumulate(annual_interest))
+    cum_daily = list(accumulate(a / 365 for a in annual_interest))
 
-    total_debt = sum(float(a.balance or 0) for a in sorted_accounts)
-    total_daily_interest = sum(
-        float(a.balance or 0) * float(a.interest_rate or 0) / 100 / 365
-        for a in sorted_accounts
-    )
+    total_debt = float(total_balance)
+    total_daily_interest = float(total_weighted_rate) / 100 / 365
 
     plans_result = {}
-    for plan_name, limit in plan_limits.items():
+    for plan_name, limit in PLAN_LIMITS.items():
         # Take top N accounts by APR for this plan
-        plan_accounts = sorted_accounts[:limit]
-        n_used = len(plan_accounts)
+        n_used = min(limit, len(accounts))
+        last = n_used - 1
 
         # Calculate annual interest for these accounts (minimum payment path)
-        annual_interest_without = sum(
-            float(a.balance or 0) * float(a.interest_rate or 0) / 100
-            for a in plan_accounts
-        )
+        annual_interest_without = cum_annual[last]
 
         # With velocity: accelerated payoff reduces total interest paid
         # Over the lifetime, velocity saves ~40% of remaining interest
@@ -438,7 +604,7 @@ async def get_savings_estimate(
         annual_savings = annual_interest_without - annual_interest_with
 
         # ROI calculation: how quickly does the plan pay for itself?
-        plan_cost = plan_costs_annual[plan_name]
+        plan_cost = PLAN_COSTS_ANNUAL[plan_name]
         if annual_savings > 0 and plan_cost > 0:
             roi_days = round(plan_cost / annual_savings * 365)
         elif plan_cost == 0:
@@ -447,8 +613,8 @@ async def get_savings_estimate(
             roi_days = 999
 
         # Estimate years to payoff
-        avg_balance = sum(float(a.balance or 0) for a in plan_accounts) / max(n_used, 1)
-        avg_rate = sum(float(a.interest_rate or 0) for a in plan_accounts) / max(n_used, 1)
+        avg_balance = cum_balance[last] / n_used
+        avg_rate = cum_rate[last] / n_used
         years_without = min(30, max(5, round(avg_balance / max(avg_rate * 100, 1))))  # rough estimate
         years_with = max(2, round(years_without * (1 - VELOCITY_ACCELERATION)))
 
@@ -456,10 +622,7 @@ async def get_savings_estimate(
         total_interest_without = round(annual_interest_without * years_without)
         total_interest_with = round(annual_interest_with * years_with)
 
-        daily_interest = sum(
-            float(a.balance or 0) * float(a.interest_rate or 0) / 100 / 365
-            for a in plan_accounts
-        )
+        daily_interest = cum_daily[last]
 
         plans_result[plan_name] = {
             "accounts_used": n_used,
@@ -474,16 +637,16 @@ async def get_savings_estimate(
             "total_interest_with": total_interest_with,
         }
 
-    return {
+    return KoreXJSONResponse({
         "has_data": True,
         "total_debt": round(total_debt, 2),
         "daily_interest_all": round(total_daily_interest, 2),
         "plans": plans_result,
         "social_proof": {
-            "total_accounts_monitored": len(accounts),
+            "total_accounts_monitored": accounts_count,
             "total_debt_tracked": round(total_debt, 2),
         },
-    }
+    })
 
 
 # ── POST /apply-promo — Server-side promo code validation ────
@@ -491,6 +654,9 @@ class PromoRequest(BaseModel):
     code: str
 
 
+_PROMO_DEV_BYTES = b"KOREX-DEV-UNLIMITED"
+
+
 @router.post("/apply-promo")
 async def apply_promo_code(
     body: PromoRequest,
@@ -501,10 +667,10 @@ async def apply_promo_code(
     Validates a promo code server-side.
     Currently supports the developer code only.
     """
-    code = body.code.strip().upper()
+    code_bytes = body.code.strip().upper().encode()
 
-    # Developer code — grants unlimited access
-    if code == "KOREX-DEV-UNLIMITED":
+    # Developer code — grants unlimited access (constant-time compare: no timing oracle)
+    if hmac.compare_digest(code_bytes, _PROMO_DEV_BYTES):
         # Upsert subscription to freedom-dev plan (consistent with frontend)
         _upsert_subscription(
             session=session,
@@ -532,12 +698,21 @@ async def apply_promo_code(
 
 
 # ── Helpers ──────────────────────────────────────────────────
+def _get_subscription(session: Session, user_id: str) -> Optional[Subscription]:
+    """The user's subscription row — point lookup on the unique user_id index."""
+    return session.exec(
+        select(Subscription).where(Subscription.user_id == user_id)
+    ).first()
+
+
+def _str_or_empty(value) -> str:
+    """LS sends IDs as ints or strings; normalise to str ("" when absent)."""
+    return "" if value is None else str(value)
+
+
 def _variant_to_plan(variant_id: str) -> str:
     """Reverse-lookup: variant_id → plan name."""
-    for plan_name, variants in PLAN_VARIANTS.items():
-        if variant_id in (variants.get("monthly"), variants.get("annual")):
-            return plan_name
-    return "starter"  # Fallback
+    return _VARIANT_TO_PLAN.get(variant_id, "starter")  # Fallback: starter
 
 
 def _upsert_subscription(
@@ -550,39 +725,38 @@ def _upsert_subscription(
     current_period_end: Optional[str] = None,
     update_payment_method_url: Optional[str] = None,
     customer_portal_url: Optional[str] = None,
+    now: Optional[datetime] = None,
 ):
-    """Create or update subscription record for a user."""
-    existing = session.exec(
-        select(Subscription).where(Subscription.user_id == user_id)
-    ).first()
-
-    now = datetime.utcnow().isoformat()
-
-    if existing:
-        existing.plan = plan
-        existing.status = status
-        existing.ls_subscription_id = ls_subscription_id
-        existing.ls_customer_id = ls_customer_id or existing.ls_customer_id
-        existing.current_period_end = current_period_end or existing.current_period_end
-        existing.updated_at = now
-        if update_payment_method_url:
-            existing.update_payment_method_url = update_payment_method_url
-        if customer_portal_url:
-            existing.customer_portal_url = customer_portal_url
-        session.add(existing)
-    else:
-        sub = Subscription(
-            user_id=user_id,
-            plan=plan,
-            status=status,
-            ls_subscription_id=ls_subscription_id,
-            ls_customer_id=ls_customer_id,
-            current_period_end=current_period_end,
-            update_payment_method_url=update_payment_method_url,
-            customer_portal_url=customer_portal_url,
-            created_at=now,
-            updated_at=now,
-        )
-        session.add(sub)
+    """Create or update subscription record for a user — one INSERT ... ON CONFLICT round trip.
 
+    `now` is the caller's request timestamp (defaults to the current UTC time);
+    it is formatted once and stored as the same ISO string in both audit columns.
+    """
+    now = (now or datetime.utcnow()).isoformat()
+
+    # Always overwritten on update; the optional fields below only when provided,
+    # so an event without them keeps the values already stored
+    updates = {
+        "plan": plan,
+        "status": status,
+        "ls_subscription_id": ls_subscription_id,
+        "updated_at": now,
+    }
+    optional = {
+        "ls_customer_id": ls_customer_id,
+        "current_period_end": current_period_end,
+        "update_payment_method_url": update_payment_method_url,
+        "customer_portal_url": customer_portal_url,
+    }
+    updates.update((column, value) for column, value in optional.items() if value)
+
+    insert = _UPSERT_INSERT[session.get_bind().dialect.name]
+    stmt = insert(Subscription).values(
+        {"user_id": user_id, **optional, **updates, "created_at": now}
+    ).on_conflict_do_update(
+        index_elements=[Subscription.user_id],
+        set_=updates,
+    )
+    session.execute(stmt)
     session.commit()
+    _STATUS_CACHE.discard(user_id)
@@ -3,161 +3,198 @@ Transactions Router — Create, list, and sync transactions.
 Includes Plaid transaction sync (kept together since they share schemas).
 """
 from fastapi import APIRouter, HTTPException, Depends
+from pydantic import BaseModel
 from sqlmodel import Session, select
+from sqlalchemy import Date, cast, func, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from decimal import Decimal
-from datetime import date, timedelta
 from typing import List
 import uuid
 
-from database import engine
-from models import Account, Transaction, TransactionCreate, MovementLog
+from cache import TTLCache
+from database import get_session
+from models import Account, Transaction, TransactionCreate, MovementLog, PlaidItem
 from helpers import bypass_fk
+from token_crypto import InvalidToken, decrypt_token, encrypt_token, is_configured as token_crypto_configured
 from auth import get_current_user_id
-
-import sys, os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from responses import KoreXJSONResponse
 from core_engine.calculators import calculate_minimum_payment
 
-from transaction_classifier import classify_transaction
+from transaction_classifier import classify_batch
+
+# Every handler renders through orjson (Decimal-aware) unless it returns its own Response
+router = APIRouter(prefix="/api", tags=["transactions"], default_response_class=KoreXJSONResponse)
+
+# ISO "YYYY-MM-DD" text column shifted by N days, as the same text format (per dialect)
+_DATE_SHIFT = {
+    "postgresql": lambda col, days: func.to_char(cast(col, Date) + days, "YYYY-MM-DD"),
+    "sqlite": lambda col, days: func.date(col, f"{days:+d} days"),
+}
 
-router = APIRouter(prefix="/api", tags=["transactions"])
+# Columns read by /transactions/all, in row order — fetched as plain tuples
+_ALL_TX_COLUMNS = (
+    Transaction.id,
+    Transaction.date,
+    Transaction.amount,
+    Transaction.description,
+    Transaction.category,
+    Transaction.account_id,
+    func.coalesce(Account.name, "Unknown").label("account_name"),
+)
+
+# Handlers are plain `def` on the request-scoped `get_session` Session: their DB
+# (and Plaid SDK) calls block, so FastAPI runs them in its threadpool.
 
 
 @router.post("/transactions", response_model=Transaction)
-async def create_transaction(tx: TransactionCreate, user_id: str = Depends(get_current_user_id)):
-    with Session(engine) as session:
-        account = session.exec(select(Account).where(Account.id == tx.account_id, Account.user_id == user_id)).first()
-        if not account:
-            raise HTTPException(status_code=404, detail="Account not found")
-
-        # 1. Create Transaction
-        db_tx = Transaction(
-            account_id=tx.account_id,
-            amount=tx.amount,
-            description=tx.description,
-            category=tx.category,
-            date=tx.date,
-            user_id=user_id,
+def create_transaction(
+    tx: TransactionCreate,
+    user_id: str = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
+    account = session.exec(select(Account).where(Account.id == tx.account_id, Account.user_id == user_id)).first()
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    # 1. Create Transaction
+    db_tx = Transaction(
+        account_id=tx.account_id,
+        amount=tx.amount,
+        description=tx.description,
+        category=tx.category,
+        date=tx.date,
+        user_id=user_id,
+    )
+    session.add(db_tx)
+
+    # 2. Update Account Balance
+    amount_decimal = tx.amount  # already a Decimal — TransactionCreate validates it
+    abs_amount = abs(amount_decimal)
+
+    if account.type == "debt":
+        if tx.category == "payment":
+            # Cap debt payment at outstanding balance
+            abs_amount = min(abs_amount, account.balance)
+            account.balance -= abs_amount
+        else:
+            account.balance += abs_amount
+        account.min_payment = calculate_minimum_payment(
+            account.balance, account.interest_rate,
+            account.interest_type, account.remaining_months,
         )
-        session.add(db_tx)
-
-        # 2. Update Account Balance
-        amount_decimal = Decimal(str(tx.amount))
-        abs_amount = abs(amount_decimal)
-
-        if account.type == "debt":
-            if tx.category == "payment":
-                # Cap debt payment at outstanding balance
-                abs_amount = min(abs_amount, account.balance)
-                account.balance -= abs_amount
-            else:
-                account.balance += abs_amount
-            account.min_payment = calculate_minimum_payment(
-                account.balance, account.interest_rate,
-                account.interest_type, account.remaining_months,
+    else:
+        # Guard: prevent negative balance on non-debt accounts
+        new_balance = account.balance + amount_decimal
+        if new_balance < 0:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "code": "INSUFFICIENT_FUNDS",
+                    "message": f"Fondos insuficientes. {account.name} tiene ${account.balance:.2f}, no se puede deducir ${abs(amount_decimal):.2f}.",
+                    "account_name": account.name,
+                    "current_balance": float(account.balance),
+                    "requested_amount": float(abs(amount_decimal)),
+                },
             )
-        else:
-            # Guard: prevent negative balance on non-debt accounts
-            new_balance = account.balance + amount_decimal
-            if new_balance < 0:
-                raise HTTPException(
-                    status_code=400,
-                    detail={
-                        "code": "INSUFFICIENT_FUNDS",
-                        "message": f"Fondos insuficientes. {account.name} tiene ${account.balance:.2f}, no se puede deducir ${abs(amount_decimal):.2f}.",
-                        "account_name": account.name,
-                        "current_balance": float(account.balance),
-                        "requested_amount": float(abs(amount_decimal)),
-                    },
-                )
-            account.balance = new_balance
+        account.balance = new_balance
 
-        session.add(account)
-        with bypass_fk(session):
-            session.commit()
-        session.refresh(db_tx)
-        return db_tx
+    session.add(account)
+    with bypass_fk(session):
+        session.commit()
+    session.refresh(db_tx)
+    return db_tx
 
 
 @router.get("/accounts/{account_id}/transactions", response_model=List[Transaction])
-async def get_account_transactions(account_id: int, user_id: str = Depends(get_current_user_id)):
-    with Session(engine) as session:
-        account = session.exec(select(Account).where(Account.id == account_id, Account.user_id == user_id)).first()
-        if not account:
-            raise HTTPException(status_code=404, detail="Account not found")
-        return session.exec(
-            select(Transaction).where(Transaction.account_id == account_id, Transaction.user_id == user_id)
-            .order_by(Transaction.date.desc())
-        ).all()
+def get_account_transactions(
+    account_id: int,
+    user_id: str = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
+    # Ownership check only needs presence — fetch the id, not the whole Account row
+    owned = session.exec(select(Account.id).where(Account.id == account_id, Account.user_id == user_id)).first()
+    if owned is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return session.exec(
+        select(Transaction).where(Transaction.account_id == account_id, Transaction.user_id == user_id)
+        .order_by(Transaction.date.desc())
+    ).all()
 
 
 @router.post("/transactions/manual")
-async def create_manual_transaction(tx: TransactionCreate, user_id: str = Depends(get_current_user_id)):
+def create_manual_transaction(
+    tx: TransactionCreate,
+    user_id: str = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
     """Manually create a transaction and update account balance."""
-    with Session(engine) as session:
-        account = session.exec(select(Account).where(Account.id == tx.account_id, Account.user_id == user_id)).first()
-        if not account:
-            raise HTTPException(status_code=404, detail="Account not found")
-
-        new_tx = Transaction(
-            account_id=tx.account_id,
-            amount=tx.amount,
-            description=tx.description,
-            category=tx.category,
-            date=tx.date,
-            plaid_transaction_id=f"manual-{uuid.uuid4()}",
-            user_id=user_id,
+    account = session.exec(select(Account).where(Account.id == tx.account_id, Account.user_id == user_id)).first()
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    new_tx = Transaction(
+        account_id=tx.account_id,
+        amount=tx.amount,
+        description=tx.description,
+        category=tx.category,
+        date=tx.date,
+        plaid_transaction_id=f"manual-{uuid.uuid4()}",
+        user_id=user_id,
+    )
+    session.add(new_tx)
+
+    abs_amount = abs(tx.amount)  # already a Decimal — TransactionCreate validates it
+    if account.type == "debt":
+        if tx.category == "payment":
+            # Cap debt payment at outstanding balance
+            abs_amount = min(abs_amount, account.balance)
+            account.balance -= abs_amount
+        else:
+            account.balance += abs_amount
+        account.min_payment = calculate_minimum_payment(
+            account.balance, account.interest_rate,
+            account.interest_type, account.remaining_months,
         )
-        session.add(new_tx)
-
-        abs_amount = abs(Decimal(str(tx.amount)))
-        if account.type == "debt":
-            if tx.category == "payment":
-                # Cap debt payment at outstanding balance
-                abs_amount = min(abs_amount, account.balance)
-                account.balance -= abs_amount
-            else:
-                account.balance += abs_amount
-            account.min_payment = calculate_minimum_payment(
-                account.balance, account.interest_rate,
-                account.interest_type, account.remaining_months,
+    else:
+        amount_decimal = tx.amount
+        new_balance = account.balance + amount_decimal
+        # Guard: prevent negative balance on non-debt accounts
+        if new_balance < 0:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "code": "INSUFFICIENT_FUNDS",
+                    "message": f"Fondos insuficientes. {account.name} tiene ${account.balance:.2f}, no se puede deducir ${abs(amount_decimal):.2f}.",
+                    "account_name": account.name,
+                    "current_balance": float(account.balance),
+                    "requested_amount": float(abs(amount_decimal)),
+                },
             )
-        else:
-            amount_decimal = Decimal(str(tx.amount))
-            new_balance = account.balance + amount_decimal
-            # Guard: prevent negative balance on non-debt accounts
-            if new_balance < 0:
-                raise HTTPException(
-                    status_code=400,
-                    detail={
-                        "code": "INSUFFICIENT_FUNDS",
-                        "message": f"Fondos insuficientes. {account.name} tiene ${account.balance:.2f}, no se puede deducir ${abs(amount_decimal):.2f}.",
-                        "account_name": account.name,
-                        "current_balance": float(account.balance),
-                        "requested_amount": float(abs(amount_decimal)),
-                    },
-                )
-            account.balance = new_balance
+        account.balance = new_balance
 
-        session.add(account)
-        with bypass_fk(session):
-            session.commit()
-        session.refresh(new_tx)
-        return new_tx
+    session.add(account)
+    with bypass_fk(session):
+        session.commit()
+    session.refresh(new_tx)
+    return new_tx
 
 
 @router.get("/transactions/recent", response_model=List[Transaction])
-async def get_recent_transactions(limit: int = 10, user_id: str = Depends(get_current_user_id)):
+def get_recent_transactions(
+    limit: int = 10,
+    user_id: str = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
     """Fetch most recent transactions for current user."""
-    with Session(engine) as session:
-        return session.exec(
-            select(Transaction).where(Transaction.user_id == user_id)
-            .order_by(Transaction.date.desc()).limit(limit)
-        ).all()
+    return session.exec(
+        select(Transaction).where(Transaction.user_id == user_id)
+        .order_by(Transaction.date.desc()).limit(limit)
+    ).all()
 
 
 @router.get("/transactions/all")
-async def get_all_transactions(
+def get_all_transactions(
     account_id: int = None,
     category: str = None,
     date_from: str = None,
@@ -166,69 +203,92 @@ async def get_all_transactions(
     limit: int = 100,
     offset: int = 0,
     user_id: str = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
 ):
     """Full transaction history with filtering, search, and pagination."""
-    with Session(engine) as session:
-        query = select(Transaction).where(Transaction.user_id == user_id)
-
-        if account_id:
-            query = query.where(Transaction.account_id == account_id)
-        if category:
-            query = query.where(Transaction.category == category)
-        if date_from:
-            query = query.where(Transaction.date >= date_from)
-        if date_to:
-            query = query.where(Transaction.date <= date_to)
-        if search:
-            query = query.where(Transaction.description.ilike(f"%{search}%"))
-
-        # Count total before pagination
-        from sqlalchemy import func
-        count_query = select(func.count()).select_from(query.subquery())
-        total = session.exec(count_query).one()
-
-        results = session.exec(
-            query.order_by(Transaction.date.desc()).offset(offset).limit(limit)
-        ).all()
-
-        # Get account names for mapping
-        account_ids = list(set(tx.account_id for tx in results if tx.account_id))
-        accounts = {}
-        if account_ids:
-            accs = session.exec(select(Account).where(Account.id.in_(account_ids))).all()
-            accounts = {a.id: a.name for a in accs}
-
-        return {
-            "transactions": [
-                {
-                    "id": tx.id,
-                    "date": tx.date,
-                    "amount": float(tx.amount),
-                    "description": tx.description,
-                    "category": tx.category,
-                    "account_id": tx.account_id,
-                    "account_name": accounts.get(tx.account_id, "Unknown"),
-                }
-                for tx in results
-            ],
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-        }
+    filters = [Transaction.user_id == user_id]
+
+    if account_id:
+        filters.append(Transaction.account_id == account_id)
+    if category:
+        filters.append(Transaction.category == category)
+    if date_from:
+        filters.append(Transaction.date >= date_from)
+    if date_to:
+        filters.append(Transaction.date <= date_to)
+    if search:
+        filters.append(Transaction.description.ilike(f"%{search}%"))
+
+    # Only the reported columns, with the account name joined in (no ORM rows, no
+    # second lookup); page + filtered total in one pass: COUNT(*) OVER () is
+    # computed before OFFSET/LIMIT
+    rows = session.exec(
+        select(*_ALL_TX_COLUMNS, func.count().over())
+        .join(Account, Account.id == Transaction.account_id, isouter=True)
+        .where(*filters)
+        .order_by(Transaction.date.desc()).offset(offset).limit(limit)
+    ).all()
+    if rows:
+        total = rows[0][-1]
+    else:
+        # Empty page (no matches, or offset past the end) — the total still needs counting
+        total = session.exec(select(func.count()).select_from(Transaction).where(*filters)).one()
+
+    return {
+        "transactions": [
+            {
+                "id": tx_id,
+                "date": tx_date,
+                "amount": amount,  # Decimal — encoded as a JSON number by orjson
+                "description": description,
+                "category": tx_category,
+                "account_id": tx_account_id,
+                "account_name": account_name,
+            }
+            for tx_id, tx_date, amount, description, tx_category, tx_account_id, account_name, _ in rows
+        ],
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+    }
 
 
 # ── PLAID SYNC (kept here with transactions) ──────────────────
-
-from pydantic import BaseModel
+# plaid_service is imported inside each handler on purpose: it pulls in the
+# plaid SDK (hundreds of model modules), which stays off the app's import path
+# until a Plaid endpoint is actually used — and a broken SDK install surfaces as
+# that endpoint's 500 instead of failing the whole router.
 
 class PlaidPublicToken(BaseModel):
     public_token: str
 
-class PlaidAccessToken(BaseModel):
-    access_token: str
-
-# In-memory token storage (production: persist to DB)
-plaid_tokens: dict = {}
+# Dialect-specific INSERT constructs — both support ON CONFLICT ... DO UPDATE
+_UPSERT_INSERT = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+# Per-worker cache of each user's decrypted access token (memory only — the DB
+# holds ciphertext); re-linking drops the entry here, other workers pick the
+# new token up within the TTL
+_access_token_cache = TTLCache(ttl_seconds=300, maxsize=10000)
+
+
+def _get_access_token(session: Session, user_id: str) -> str:
+    """The user's stored Plaid access token, decrypted (400 if no bank is linked)."""
+    access_token = _access_token_cache.get(user_id)
+    if access_token is None:
+        encrypted = session.exec(
+            select(PlaidItem.access_token_encrypted).where(PlaidItem.user_id == user_id)
+        ).first()
+        if not encrypted:
+            raise HTTPException(status_code=400, detail="No bank linked. Connect a bank first.")
+        if not token_crypto_configured():
+            raise HTTPException(status_code=503, detail="Bank linking not configured. Contact support.")
+        try:
+            access_token = decrypt_token(encrypted)
+        except InvalidToken:
+            # Key rotated or value tampered with — the stored link is unusable
+            raise HTTPException(status_code=400, detail="Bank link could not be read. Reconnect your bank.")
+        _access_token_cache.set(user_id, access_token)
+    return access_token
 
 
 @router.get("/plaid/create_link_token")
@@ -243,23 +303,44 @@ def api_create_link_token():
 
 
 @router.post("/plaid/exchange_public_token")
-def api_exchange_public_token(data: PlaidPublicToken):
+def api_exchange_public_token(
+    data: PlaidPublicToken,
+    user_id: str = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
     """Exchange public token for access token after user links bank."""
+    # Tokens are only ever stored encrypted — refuse before exchanging without a key
+    if not token_crypto_configured():
+        raise HTTPException(status_code=503, detail="Bank linking not configured. Contact support.")
     try:
         from plaid_service import exchange_public_token
         result = exchange_public_token(data.public_token)
-        plaid_tokens["current"] = result["access_token"]
+
+        # Persist per user (one round trip); re-linking replaces the stored item
+        values = {
+            "access_token_encrypted": encrypt_token(result["access_token"]),
+            "item_id": result["item_id"],
+        }
+        insert_stmt = _UPSERT_INSERT[session.get_bind().dialect.name]
+        session.execute(
+            insert_stmt(PlaidItem)
+            .values(user_id=user_id, **values)
+            .on_conflict_do_update(index_elements=[PlaidItem.user_id], set_=values)
+        )
+        session.commit()
+        _access_token_cache.discard(user_id)
         return {"success": True, "item_id": result["item_id"]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/plaid/accounts")
-def api_get_plaid_accounts():
+def api_get_plaid_accounts(
+    user_id: str = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
     """Fetch accounts from Plaid using stored access token."""
-    access_token = plaid_tokens.get("current")
-    if not access_token:
-        raise HTTPException(status_code=400, detail="No bank linked. Connect a bank first.")
+    access_token = _get_access_token(session, user_id)
     try:
         from plaid_service import get_accounts as plaid_get_accounts
         accounts = plaid_get_accounts(access_token)
@@ -269,49 +350,49 @@ def api_get_plaid_accounts():
 
 
 @router.post("/plaid/import_accounts")
-async def api_import_plaid_accounts(user_id: str = Depends(get_current_user_id)):
+def api_import_plaid_accounts(
+    user_id: str = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
     """Import Plaid accounts into database."""
-    access_token = plaid_tokens.get("current")
-    if not access_token:
-        raise HTTPException(status_code=400, detail="No bank linked. Connect a bank first.")
+    access_token = _get_access_token(session, user_id)
 
     try:
         from plaid_service import get_accounts as plaid_get_accounts
         plaid_accounts = plaid_get_accounts(access_token)
         imported = []
 
-        with Session(engine) as session:
-            for acc in plaid_accounts:
-                existing_account = session.exec(
-                    select(Account).where(Account.plaid_account_id == acc["plaid_account_id"], Account.user_id == user_id)
-                ).first()
-
-                if existing_account:
-                    existing_account.balance = Decimal(str(abs(acc["balance"])))
-                    existing_account.name = f"{acc['name']} (...{acc['mask']})" if acc['mask'] else acc['name']
-                    continue
-
-                korex_type = "checking"
-                if acc["type"] == "credit":
-                    korex_type = "debt"
-                elif acc["type"] == "depository":
-                    korex_type = "checking" if acc["subtype"] in ["checking", None] else "savings"
-
-                new_account = Account(
-                    name=f"{acc['name']} (...{acc['mask']})" if acc['mask'] else acc['name'],
-                    type=korex_type,
-                    balance=Decimal(str(abs(acc["balance"]))),
-                    interest_rate=Decimal("0"),
-                    min_payment=Decimal("0"),
-                    payment_frequency="monthly",
-                    plaid_account_id=acc["plaid_account_id"],
-                    user_id=user_id,
-                )
-                session.add(new_account)
-                imported.append(new_account.name)
+        for acc in plaid_accounts:
+            existing_account = session.exec(
+                select(Account).where(Account.plaid_account_id == acc["plaid_account_id"], Account.user_id == user_id)
+            ).first()
+
+            if existing_account:
+                existing_account.balance = Decimal(str(abs(acc["balance"])))
+                existing_account.name = f"{acc['name']} (...{acc['mask']})" if acc['mask'] else acc['name']
+                continue
+
+            korex_type = "checking"
+            if acc["type"] == "credit":
+                korex_type = "debt"
+            elif acc["type"] == "depository":
+                korex_type = "checking" if acc["subtype"] in ["checking", None] else "savings"
+
+            new_account = Account(
+                name=f"{acc['name']} (...{acc['mask']})" if acc['mask'] else acc['name'],
+                type=korex_type,
+                balance=Decimal(str(abs(acc["balance"]))),
+                interest_rate=Decimal("0"),
+                min_payment=Decimal("0"),
+                payment_frequency="monthly",
+                plaid_account_id=acc["plaid_account_id"],
+                user_id=user_id,
+            )
+            session.add(new_account)
+            imported.append(new_account.name)
 
-            with bypass_fk(session):
-                session.commit()
+        with bypass_fk(session):
+            session.commit()
 
         return {"success": True, "imported": imported, "count": len(imported)}
     except Exception as e:
@@ -319,82 +400,89 @@ async def api_import_plaid_accounts(user_id: str = Depends(get_current_user_id))
 
 
 @router.post("/plaid/sync_transactions")
-async def api_sync_transactions(data: PlaidAccessToken, user_id: str = Depends(get_current_user_id)):
-    """Sync transactions from Plaid and persist to DB."""
+def api_sync_transactions(
+    user_id: str = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
+    """Sync transactions from Plaid (user's stored access token) and persist to DB."""
+    access_token = _get_access_token(session, user_id)
     try:
         from plaid_service import sync_transactions
-        result = sync_transactions(data.access_token)
+        result = sync_transactions(access_token)
         counts = {"added": 0, "skipped": 0}
 
-        with Session(engine) as session:
-            accounts = session.exec(
-                select(Account).where(Account.plaid_account_id != None, Account.user_id == user_id)
-            ).all()
-            account_map = {acc.plaid_account_id: acc.id for acc in accounts}
-
-            for tx in result.get("added", []):
-                local_account_id = account_map.get(tx["plaid_account_id"])
-                if not local_account_id:
-                    counts["skipped"] += 1
-                    continue
-
-                existing = session.exec(
-                    select(Transaction).where(Transaction.plaid_transaction_id == tx["plaid_transaction_id"])
-                ).first()
-                if existing:
-                    counts["skipped"] += 1
-                    continue
-
-                plaid_amount = Decimal(str(tx["amount"]))
-                classification = classify_transaction(
-                    amount=plaid_amount,
-                    name=tx["name"],
-                    merchant_name=tx.get("merchant_name"),
-                    category=tx.get("category"),
-                )
-
-                smart_category = f"{classification['tag'].title()}: {tx['category']}"
-                korex_amount = plaid_amount * Decimal("-1")
-
-                new_tx = Transaction(
-                    account_id=local_account_id,
-                    date=tx["date"],
-                    amount=korex_amount,
-                    description=tx["name"],
-                    category=smart_category,
-                    plaid_transaction_id=tx["plaid_transaction_id"],
-                    user_id=user_id,
+        # Classify the whole batch up front — pure CPU work kept out of the DB
+        # transaction, which only begins with the first query below
+        added = classify_batch(result.get("added", []))
+
+        account_map = dict(session.exec(
+            select(Account.plaid_account_id, Account.id)
+            .where(Account.plaid_account_id != None, Account.user_id == user_id)
+        ).all())
+
+        # Dedup against the DB in one IN query instead of a SELECT per transaction
+        plaid_ids = [tx["plaid_transaction_id"] for tx in added]
+        seen = set(session.exec(
+            select(Transaction.plaid_transaction_id)
+            .where(Transaction.plaid_transaction_id.in_(plaid_ids))
+        ).all()) if plaid_ids else set()
+
+        new_rows = []
+        for tx in added:
+            local_account_id = account_map.get(tx["plaid_account_id"])
+            if not local_account_id or tx["plaid_transaction_id"] in seen:
+                counts["skipped"] += 1
+                continue
+            seen.add(tx["plaid_transaction_id"])  # repeated IDs within the batch too
+
+            smart_category = f"{tx['korex_tag'].title()}: {tx['category']}"
+            # Plaid amounts are floats (str() keeps the cents exact); KoreX sign is inverted
+            korex_amount = -Decimal(str(tx["amount"]))
+
+            new_rows.append({
+                "account_id": local_account_id,
+                "date": tx["date"],
+                "amount": korex_amount,
+                "description": tx["name"],
+                "category": smart_category,
+                "plaid_transaction_id": tx["plaid_transaction_id"],
+                "user_id": user_id,
+            })
+        counts["added"] = len(new_rows)
+
+        # --- AUTO-VERIFICATION LOGIC ---
+        # One UPDATE: each executed log takes the first of the user's transactions
+        # with the same amount dated within ±3 days (correlated subquery, no N+1)
+        shift = _DATE_SHIFT[session.get_bind().dialect.name]
+        match_q = (
+            select(Transaction.id)
+            .where(
+                Transaction.user_id == user_id,
+                Transaction.amount == MovementLog.amount,
+                Transaction.date >= shift(MovementLog.date_executed, -3),
+                Transaction.date <= shift(MovementLog.date_executed, 3),
+            )
+            .order_by(Transaction.id)
+            .limit(1)
+            .correlate(MovementLog)
+            .scalar_subquery()
+        )
+        # Inserts + verification in one transaction and one commit: the UPDATE
+        # already sees the rows inserted just before it
+        with bypass_fk(session):
+            # executemany: one execute() call for the whole batch
+            if new_rows:
+                session.execute(insert(Transaction), new_rows)
+            session.execute(
+                update(MovementLog)
+                .where(
+                    MovementLog.user_id == user_id,
+                    MovementLog.status == "executed",
+                    match_q.is_not(None),
                 )
-                session.add(new_tx)
-                counts["added"] += 1
-
-            with bypass_fk(session):
-                session.commit()
-
-            # --- AUTO-VERIFICATION LOGIC ---
-            pending_logs = session.exec(
-                select(MovementLog).where(MovementLog.status == "executed", MovementLog.user_id == user_id)
-            ).all()
-            for log in pending_logs:
-                log_date = date.fromisoformat(log.date_executed)
-                start_window = (log_date - timedelta(days=3)).isoformat()
-                end_window = (log_date + timedelta(days=3)).isoformat()
-
-                match = session.exec(
-                    select(Transaction).where(
-                        Transaction.amount == log.amount,
-                        Transaction.date >= start_window,
-                        Transaction.date <= end_window,
-                    )
-                ).first()
-
-                if match:
-                    log.status = "verified"
-                    log.verified_transaction_id = match.id
-                    session.add(log)
-
-            with bypass_fk(session):
-                session.commit()
+                .values(status="verified", verified_transaction_id=match_q)
+            )
+            session.commit()
 
         return {
             "success": True,
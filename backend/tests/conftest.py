@@ -6,9 +6,8 @@ import os
 import sys
 
 # Ensure backend/ is on the path so imports work correctly from tests/
+# (core_engine is a package inside backend/, same as when uvicorn runs from there)
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-# Ensure core_engine is on the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 import pytest
 from fastapi.testclient import TestClient
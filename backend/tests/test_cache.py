@@ -0,0 +1,58 @@
+"""
+Unit tests for cache.py — in-process TTL cache used by hot read paths.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from decimal import Decimal
+from cache import TTLCache, stable_digest
+
+
+class TestTTLCache:
+
+    def test_get_or_compute_only_computes_once(self):
+        cache = TTLCache(ttl_seconds=60)
+        calls = []
+        compute = lambda: calls.append(1) or "value"
+        assert cache.get_or_compute("k", compute) == "value"
+        assert cache.get_or_compute("k", compute) == "value"
+        assert len(calls) == 1
+
+    def test_expired_entries_are_misses(self):
+        cache = TTLCache(ttl_seconds=0)
+        cache.set("k", 1)
+        assert cache.get("k") is None
+
+    def test_maxsize_evicts_oldest(self):
+        cache = TTLCache(ttl_seconds=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        assert cache.get("a") is None
+        assert cache.get("c") == 3
+
+    def test_invalidate_by_predicate(self):
+        cache = TTLCache(ttl_seconds=60)
+        cache.set(("u1", "x"), 1)
+        cache.set(("u2", "x"), 2)
+        cache.invalidate(lambda k: k[0] == "u1")
+        assert cache.get(("u1", "x")) is None
+        assert cache.get(("u2", "x")) == 2
+
+    def test_discard_drops_only_that_key(self):
+        cache = TTLCache(ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.discard("a")
+        cache.discard("missing")
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+
+class TestStableDigest:
+
+    def test_same_inputs_same_digest(self):
+        assert stable_digest(Decimal("1.00"), [1, 2]) == stable_digest(Decimal("1.00"), [1, 2])
+
+    def test_different_inputs_different_digest(self):
+        assert stable_digest(Decimal("1.00")) != stable_digest(Decimal("1.01"))
@@ -6,7 +6,7 @@ Formula: min_payment = (balance * APR/12/100) + (balance * 1%)
          floor: $25 (or balance if balance < $25)
 """
 import sys, os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from decimal import Decimal
 from core_engine.calculators import calculate_minimum_payment
@@ -0,0 +1,40 @@
+"""
+Unit tests for helpers.py — shared router helpers.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from decimal import Decimal, ROUND_HALF_UP
+from helpers import velocity_power, cached_projections
+from velocity_engine import DebtAccount, get_projections
+
+
+class TestVelocityPower:
+
+    def test_matches_decimal_quantize(self):
+        for cash in ("0", "0.01", "0.02", "0.03", "12.34", "1000.00", "4999.99", "-12.34", "-0.03"):
+            expected = (Decimal(cash) * Decimal("0.20")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            assert velocity_power(Decimal(cash)) == expected
+
+    def test_keeps_cent_precision(self):
+        assert str(velocity_power(Decimal("1000.00"))) == "200.00"
+
+    def test_accepts_int_sum_of_no_accounts(self):
+        assert velocity_power(0) == Decimal("0.00")
+
+
+class TestCachedProjections:
+
+    def _debts(self, balance="5000"):
+        return [DebtAccount(name="Card", balance=Decimal(balance), interest_rate=Decimal("24.99"),
+                            min_payment=Decimal("150"))]
+
+    def test_matches_uncached_projection(self):
+        debts = self._debts()
+        assert cached_projections(debts, Decimal("2000")) == get_projections(debts, Decimal("2000"))
+
+    def test_balance_change_is_a_new_key(self):
+        before = cached_projections(self._debts("5000"), Decimal("2000"))
+        after = cached_projections(self._debts("4000"), Decimal("2000"))
+        assert after["total_debt"] == 4000.0
+        assert before["total_debt"] == 5000.0
@@ -0,0 +1,32 @@
+"""
+Unit tests for responses.py — orjson rendering must match FastAPI's encoding.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import json
+from datetime import date
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from responses import KoreXJSONResponse, dumps
+from velocity_engine import CalendarDay
+
+
+class TestKoreXJSONResponse:
+
+    def test_decimals_match_fastapi_encoder(self):
+        payload = {"whole": Decimal("5000"), "cents": Decimal("1250.75"), "zero": Decimal("0.00")}
+        assert json.loads(dumps(payload)) == jsonable_encoder(payload)
+
+    def test_dataclasses_and_dates_match_fastapi_encoder(self):
+        day = CalendarDay(
+            date="2026-03-01", date_obj=date(2026, 3, 1), events=[],
+            starting_balance=Decimal("0"), ending_balance=Decimal("900.10"),
+        )
+        assert json.loads(dumps({"calendar": [day]})) == jsonable_encoder({"calendar": [day]})
+
+    def test_response_body_and_media_type(self):
+        resp = KoreXJSONResponse({"ok": True})
+        assert resp.body == b'{"ok":true}'
+        assert resp.media_type == "application/json"
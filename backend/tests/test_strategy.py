@@ -0,0 +1,33 @@
+"""
+Unit tests for pure helpers in routers/strategy.py.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from datetime import date
+from routers.strategy import _attack_streak
+
+
+class TestAttackStreak:
+
+    def test_counts_consecutive_months_back_from_today(self):
+        dates = ["2026-10-02", "2026-09-15", "2026-08-01", "2026-06-10"]
+        assert _attack_streak(dates, date(2026, 10, 16)) == 3
+
+    def test_crosses_year_boundary(self):
+        dates = ["2026-01-05", "2025-12-20", "2025-11-03"]
+        assert _attack_streak(dates, date(2026, 1, 31)) == 3
+
+    def test_no_attack_this_month_means_no_streak(self):
+        assert _attack_streak(["2026-09-30"], date(2026, 10, 1)) == 0
+
+    def test_ignores_missing_dates(self):
+        assert _attack_streak([None, "", "2026-10-01"], date(2026, 10, 16)) == 1
+
+    def test_skips_malformed_dates(self):
+        dates = ["garbage", "2026-1", "20xx-10-01", "2026-10-01"]
+        assert _attack_streak(dates, date(2026, 10, 16)) == 1
+
+    def test_capped_at_24_months(self):
+        dates = [f"{y}-{m:02d}-01" for y in range(2020, 2027) for m in range(1, 13)]
+        assert _attack_streak(dates, date(2026, 10, 16)) == 24
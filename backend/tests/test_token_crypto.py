@@ -0,0 +1,37 @@
+"""
+Unit tests for token_crypto.py — encryption at rest for stored Plaid tokens.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from cryptography.fernet import Fernet
+
+import token_crypto
+
+
+@pytest.fixture
+def key(monkeypatch):
+    monkeypatch.setenv("PLAID_TOKEN_KEY", Fernet.generate_key().decode())
+    token_crypto._fernet.cache_clear()
+    yield
+    token_crypto._fernet.cache_clear()
+
+
+class TestTokenCrypto:
+
+    def test_round_trip_and_ciphertext_hides_plaintext(self, key):
+        stored = token_crypto.encrypt_token("access-sandbox-123")
+        assert "access-sandbox-123" not in stored
+        assert token_crypto.decrypt_token(stored) == "access-sandbox-123"
+
+    def test_wrong_key_is_rejected(self, key, monkeypatch):
+        stored = token_crypto.encrypt_token("access-sandbox-123")
+        monkeypatch.setenv("PLAID_TOKEN_KEY", Fernet.generate_key().decode())
+        token_crypto._fernet.cache_clear()
+        with pytest.raises(token_crypto.InvalidToken):
+            token_crypto.decrypt_token(stored)
+
+    def test_not_configured_without_key(self, monkeypatch):
+        monkeypatch.delenv("PLAID_TOKEN_KEY", raising=False)
+        assert token_crypto.is_configured() is False
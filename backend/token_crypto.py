@@ -0,0 +1,44 @@
+"""
+KoreX Financial System — Credential Encryption at Rest
+
+Fernet (AES-128-CBC + HMAC-SHA256) for long-lived third-party credentials
+stored in the database — currently Plaid access tokens (plaid_items).
+The key comes from the PLAID_TOKEN_KEY env var (url-safe base64, 32 bytes):
+
+    python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
+
+Usage:
+    from token_crypto import encrypt_token, decrypt_token, is_configured
+
+    stored = encrypt_token(access_token)
+    access_token = decrypt_token(stored)
+"""
+import os
+from functools import lru_cache
+
+from cryptography.fernet import Fernet, InvalidToken
+
+__all__ = ["InvalidToken", "decrypt_token", "encrypt_token", "is_configured"]
+
+
+def is_configured() -> bool:
+    """True when an encryption key is set (bank linking is refused otherwise)."""
+    return bool(os.getenv("PLAID_TOKEN_KEY"))
+
+
+@lru_cache(maxsize=1)
+def _fernet() -> Fernet:
+    key = os.getenv("PLAID_TOKEN_KEY", "")
+    if not key:
+        raise RuntimeError("PLAID_TOKEN_KEY is not set — cannot encrypt/decrypt stored tokens")
+    return Fernet(key.encode("ascii"))
+
+
+def encrypt_token(plaintext: str) -> str:
+    """Encrypt a credential for storage; returns the Fernet token as text."""
+    return _fernet().encrypt(plaintext.encode("utf-8")).decode("ascii")
+
+
+def decrypt_token(ciphertext: str) -> str:
+    """Decrypt a stored credential. Raises InvalidToken on a wrong key or tampered value."""
+    return _fernet().decrypt(ciphertext.encode("ascii")).decode("utf-8")
@@ -4,7 +4,7 @@ Automatically categorizes transactions into Life, Debt, and Income.
 Uses heuristic-based rules for V1 (no ML dependency).
 """
 from decimal import Decimal
-from typing import Dict, Literal
+from typing import Dict, Iterable, Literal
 
 TransactionTag = Literal["income", "debt", "life", "transfer"]
 
@@ -100,12 +100,13 @@ def classify_transaction(
     return {"tag": "life", "confidence": "low"}
 
 
-def classify_batch(transactions: list) -> list:
+def classify_batch(transactions: Iterable[dict]) -> list:
     """
     Classify a batch of transactions. Each must have 'amount', 'name'.
-    Optionally 'merchant_name' and 'category'.
+    Optionally 'merchant_name' and 'category'. Accepts any iterable
+    (list or generator) of transaction dicts.
 
-    Returns the same list with 'korex_tag' and 'korex_confidence' added.
+    Returns a list of the same dicts with 'korex_tag' and 'korex_confidence' added.
     """
     results = []
     for tx in transactions:
@@ -1357,6 +1357,9 @@ def simulate_freedom_path(
             due_day=d.due_day
         ) for d in debts if d.balance > 0
     ]
+    # APRs are fixed for the whole simulation — rank once for the avalanche step
+    # (stable sort, so filtering this list each month matches re-sorting it)
+    sim_debts_by_apr = sorted(sim_debts, key=lambda x: x.interest_rate, reverse=True)
     
     timeline = []
     current_date = date.today().replace(day=1) 
@@ -1429,8 +1432,7 @@ def simulate_freedom_path(
                         month_events.append(f"{debt.name} Eliminated (gap covered)")
             
             # --- Step B: Avalanche with remaining extra ---
-            active_debts = [d for d in sim_debts if d.balance > 0]
-            active_debts.sort(key=lambda x: x.interest_rate, reverse=True)
+            active_debts = [d for d in sim_debts_by_apr if d.balance > 0]
             
             for debt in active_debts:
                 if available_for_attack <= 0: